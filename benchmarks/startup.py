@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Installer Startup Benchmark
+
+This script measures the time taken by the command-line interface to start, parse its arguments
+and dispatch commands that do not build anything.
+
+Each command is run repeatedly in a fresh interpreter against a local list of elements, so neither
+the network nor an installation of SST is required.
+
+Usage:
+    python benchmarks/startup.py [--runs <RUNS>]
+"""
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CLI_PATH = pathlib.Path(__file__).resolve().parent.parent / "installer" / "cli.py"
+
+COMMANDS = (
+    ["--help"],
+    ["--dep", "miranda"],
+    ["--dep", "zodiac"],
+    ["--list"],
+)
+
+ELEMENTS = {
+    "hermes": {"url": "https://github.com/sstsimulator/hermes", "dep": []},
+    "thornhill": {"url": "https://github.com/sstsimulator/thornhill", "dep": []},
+    "memHierarchy": {"url": "https://github.com/sstsimulator/memHierarchy", "dep": []},
+    "miranda": {"url": "https://github.com/sstsimulator/miranda", "dep": ["memHierarchy"]},
+    "zodiac": {"url": "https://github.com/sstsimulator/zodiac", "dep": ["hermes", "thornhill"]},
+}
+
+
+def time_command(args, env, runs):
+    """Time repeated runs of a command of the command-line interface
+
+    Parameters:
+    -----------
+    args : list(str)
+        arguments to the command-line interface
+    env : dict(str, str)
+        environment of the runs
+    runs : int
+        number of runs
+
+    Returns:
+    --------
+    list(float)
+        wall times of the runs in seconds
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(CLI_PATH)] + args, env=env, cwd=CLI_PATH.parent,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark the startup of the installer")
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs per command")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as src_dir:
+
+        list_path = pathlib.Path(src_dir) / "elements.json"
+        with list_path.open("w") as list_file:
+            json.dump(ELEMENTS, list_file)
+
+        env = dict(os.environ)
+        env["ELEMENT_SRC_DIR"] = src_dir
+        env["ELEMENT_LIST_URL"] = list_path.as_uri()
+        env["SST_CONFIG_FILE"] = str(pathlib.Path(src_dir) / "sstsimulator.conf")
+
+        print(f"{'command':<24}{'median (ms)':>14}{'min (ms)':>14}")
+        for command in COMMANDS:
+            times = time_command(command, env, args.runs)
+            print(f"{' '.join(command):<24}{statistics.median(times) * 1000:>14.1f}"
+                  f"{min(times) * 1000:>14.1f}")
@@ -0,0 +1,456 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Installer Benchmark Suite
+
+This script benchmarks the installer in synthetic environments that require neither the network
+nor an installation of SST.
+
+Every environment is made of:
+    - a generated list of elements whose dependencies form a random directed acyclic graph, served
+      through a file URL or a local HTTP server
+    - a local bare repository holding a trivial CMake project, which every element is cloned from
+    - fake `sst` and `sst-register` scripts on PATH, with the registry kept in a local
+      configuration file
+
+Each size of environment is benchmarked in a fresh process. The results are appended to a history
+file along with the commit of the installer they were measured on, and compared to the previous
+results to report regressions.
+
+Usage:
+    python benchmarks/suite.py [--sizes <N> ...] [--repeat <RUNS>] [--http] [--fail]
+"""
+import argparse
+import datetime
+import functools
+import http.server
+import json
+import os
+import pathlib
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
+INSTALLER_DIR = ROOT_DIR / "installer"
+HISTORY_FILE = ROOT_DIR / "benchmarks" / "history.jsonl"
+# seconds under which a slowdown is considered noise
+MIN_DELTA = 1e-3
+
+SST = """#!/usr/bin/env python3
+print("SST-Core Version (13.0.0)")
+"""
+
+# mirrors the options of sst-register used by the installer and the element builds. The
+# configuration file is edited under a lock of its own and replaced atomically, so that concurrent
+# calls neither lose entries nor expose a truncated file.
+SST_REGISTER = """#!/usr/bin/env python3
+import configparser
+import fcntl
+import os
+import sys
+
+path = os.environ["SST_CONFIG_FILE"]
+lock_file = open(f"{path}.lock", "w")
+fcntl.flock(lock_file, fcntl.LOCK_EX)
+config = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+config.optionxform = str
+config.read(path)
+
+if sys.argv[1] == "-l":
+    names = list(config["SST_ELEMENT_SOURCE"]) if config.has_section("SST_ELEMENT_SOURCE") else []
+    names += [section for section in config.sections() if f"{section}_LIBDIR" in config[section]]
+    for index, name in enumerate(names, 1):
+        print(f"{index}. {name}  VALID")
+    sys.exit()
+
+if sys.argv[1] == "-u":
+    config.remove_section(sys.argv[2])
+    for section in config.sections():
+        config.remove_option(section, sys.argv[2])
+else:
+    option, value = sys.argv[2].split("=", 1)
+    if not config.has_section(sys.argv[1]):
+        config.add_section(sys.argv[1])
+    config[sys.argv[1]][option] = value
+
+tmp_path = f"{path}.{os.getpid()}"
+with open(tmp_path, "w") as config_file:
+    config.write(config_file)
+os.replace(tmp_path, path)
+"""
+
+# the project is named after the directory it is cloned to, so every element shares the repository
+CMAKE_LISTS = """cmake_minimum_required(VERSION 3.10)
+get_filename_component(ELEMENT ${CMAKE_SOURCE_DIR} NAME)
+project(${ELEMENT} C)
+add_library(${ELEMENT} SHARED element.c)
+add_custom_command(TARGET ${ELEMENT} POST_BUILD
+                   COMMAND sst-register ${ELEMENT} ${ELEMENT}_LIBDIR=${CMAKE_BINARY_DIR})
+"""
+
+ELEMENT_SOURCE = """int element(void) { return 0; }
+"""
+
+
+def generate_elements(size, max_deps=3, seed=0):
+    """Generate a list of elements with random acyclic dependencies
+
+    Every element only depends on elements preceding it, which keeps the graph acyclic.
+
+    Parameters:
+    -----------
+    size : int
+        number of elements
+    max_deps : int (default: 3)
+        maximum number of dependencies of an element
+    seed : int (default: 0)
+        seed of the random generator
+
+    Returns:
+    --------
+    dict(str, dict)
+        list of elements in the format of the official list
+    """
+    rng = random.Random(seed)
+    names = [f"element{index:04d}" for index in range(size)]
+    return {
+        name: {
+            "url": "",
+            "dep": rng.sample(names[:index], rng.randint(0, min(index, max_deps))),
+        }
+        for index, name in enumerate(names)
+    }
+
+
+def create_environment(root, size, registered=0.25, seed=0):
+    """Create a synthetic environment
+
+    Parameters:
+    -----------
+    root : pathlib.Path
+        directory of the environment
+    size : int
+        number of elements
+    registered : float (default: 0.25)
+        fraction of the elements registered beforehand
+    seed : int (default: 0)
+        seed of the random generator
+
+    Returns:
+    --------
+    dict(str, str)
+        environment variables pointing the installer to the environment
+    """
+    env = dict(os.environ)
+    env["GIT_AUTHOR_NAME"] = env["GIT_COMMITTER_NAME"] = "benchmark"
+    env["GIT_AUTHOR_EMAIL"] = env["GIT_COMMITTER_EMAIL"] = "benchmark@localhost"
+
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    for name, script in (("sst", SST), ("sst-register", SST_REGISTER)):
+        (bin_dir / name).write_text(script)
+        (bin_dir / name).chmod(0o755)
+
+    work_dir = root / "work"
+    work_dir.mkdir()
+    (work_dir / "CMakeLists.txt").write_text(CMAKE_LISTS)
+    (work_dir / "element.c").write_text(ELEMENT_SOURCE)
+    repo_path = root / "element.git"
+    for cmd in ("git init -q -b master", "git add -A", "git commit -q -m element",
+                f"git clone -q --bare . {repo_path}"):
+        subprocess.run(cmd, shell=True, cwd=work_dir, env=env, check=True)
+
+    elements = generate_elements(size, seed=seed)
+    for info in elements.values():
+        info["url"] = repo_path.as_uri()
+    with (root / "elements.json").open("w") as list_file:
+        json.dump(elements, list_file)
+
+    src_dir = root / "src"
+    src_dir.mkdir()
+    config_path = src_dir / "sstsimulator.conf"
+    with config_path.open("w") as config_file:
+        for name in random.Random(seed).sample(sorted(elements), int(size * registered)):
+            config_file.write(f"[{name}]\n{name}_LIBDIR = {root / 'lib' / name}\n\n")
+
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env['PATH']}"
+    env["ELEMENT_LIST_URL"] = (root / "elements.json").as_uri()
+    env["ELEMENT_SRC_DIR"] = str(src_dir)
+    env["SST_CONFIG_FILE"] = str(config_path)
+    env.pop("ELEMENT_ARTIFACT_DIR", None)
+    return env
+
+
+def measure(func, repeat):
+    """Measure the median wall time of a function
+
+    Parameters:
+    -----------
+    func : callable
+        function to measure
+    repeat : int
+        number of runs
+
+    Returns:
+    --------
+    float
+        median wall time in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run_benchmarks(repeat, install_size):
+    """Benchmark the installer in the environment described by the environment variables
+
+    Parameters:
+    -----------
+    repeat : int
+        number of runs of the benchmarks of queries
+    install_size : int
+        maximum number of elements installed by the installation benchmark
+
+    Returns:
+    --------
+    dict(str, float)
+        wall time in seconds of every benchmark
+    """
+    sys.path.insert(0, str(INSTALLER_DIR))
+    import installer
+    import resolver
+
+    installer.LOG = False
+    results = {}
+
+    # the list is downloaded and parsed on every call without the caches
+    installer.CACHE = False
+    results["list_all_elements (uncached)"] = measure(installer.list_all_elements, repeat)
+    installer.CACHE = True
+    results["list_all_elements (revalidated)"] = measure(
+        lambda: installer.list_all_elements(refresh=True), repeat
+    )
+    results["list_all_elements (memoized)"] = measure(installer.list_all_elements, repeat)
+    all_elements = installer.list_all_elements()
+
+    # touching the configuration file forces the registry to be read again
+    config_path = pathlib.Path(os.environ["SST_CONFIG_FILE"])
+
+    def read_registry():
+        os.utime(config_path, ns=(time.time_ns(), time.time_ns()))
+        installer.list_registered_elements()
+
+    results["list_registered_elements"] = measure(read_registry, repeat)
+
+    results["get_dependencies (all elements)"] = measure(
+        lambda: [installer.get_dependencies(element) for element in all_elements], repeat
+    )
+    results["topological_order (all elements)"] = measure(
+        lambda: resolver.DependencyGraph(all_elements).topological_order(all_elements), repeat
+    )
+
+    # install the element with the largest set of dependencies that fits the installation size
+    graph = resolver.DependencyGraph(all_elements)
+    root = max(
+        (element for element in all_elements if len(graph.closure([element])) <= install_size),
+        key=lambda element: len(graph.closure([element]))
+    )
+    trace_path = pathlib.Path(os.environ["ELEMENT_SRC_DIR"]).parent / "install.json"
+    start = time.perf_counter()
+    returncode = installer.install(root, force=True, trace=str(trace_path))
+    results[f"install ({len(graph.closure([root]))} elements)"] = time.perf_counter() - start
+    # an installation that loses elements would be measured faster than it is
+    missing = set(graph.closure([root])) - set(installer.list_registered_elements())
+    if returncode or missing:
+        raise RuntimeError(f"installation of {root} failed, unregistered: {sorted(missing)}")
+
+    with trace_path.open() as trace_file:
+        clones = [event for event in json.load(trace_file)["traceEvents"]
+                  if event.get("cat") == "clone"]
+    results["clone (install phase)"] = (
+        max(event["ts"] + event["dur"] for event in clones) - min(event["ts"] for event in clones)
+    ) / 1e6 if clones else 0.0
+
+    start = time.perf_counter()
+    installer.uninstall(root, force=True)
+    results["uninstall"] = time.perf_counter() - start
+
+    return results
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Request handler that does not log requests"""
+
+    def log_message(self, *args):
+
+        pass
+
+
+def serve(directory):
+    """Serve a directory over HTTP from a background thread
+
+    Parameters:
+    -----------
+    directory : pathlib.Path
+        directory to serve
+
+    Returns:
+    --------
+    http.server.ThreadingHTTPServer
+        running server
+    """
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def benchmark_size(size, repeat, install_size, use_http):
+    """Create an environment and benchmark the installer in a fresh process
+
+    Parameters:
+    -----------
+    size : int
+        number of elements
+    repeat : int
+        number of runs of the benchmarks of queries
+    install_size : int
+        maximum number of elements installed by the installation benchmark
+    use_http : bool
+        flag to serve the list of elements over HTTP instead of a file URL
+
+    Returns:
+    --------
+    dict(str, float)
+        wall time in seconds of every benchmark
+    """
+    with tempfile.TemporaryDirectory() as root:
+        env = create_environment(pathlib.Path(root), size)
+        server = serve(root) if use_http else None
+        if server:
+            env["ELEMENT_LIST_URL"] = f"http://127.0.0.1:{server.server_port}/elements.json"
+        try:
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--worker", "--repeat", str(repeat),
+                 "--install-size", str(install_size)], env=env
+            )
+        finally:
+            if server:
+                server.shutdown()
+
+    return json.loads(output)
+
+
+def current_commit():
+    """Get the commit of the installer being benchmarked
+
+    Returns:
+    --------
+    str
+        commit SHA, suffixed with "-dirty" if the installer has uncommitted changes
+    """
+    try:
+        commit = subprocess.check_output("git rev-parse HEAD", shell=True, cwd=ROOT_DIR,
+                                         stderr=subprocess.DEVNULL).decode("utf-8").strip()
+        dirty = subprocess.check_output("git status --porcelain installer", shell=True,
+                                        cwd=ROOT_DIR).decode("utf-8").strip()
+    except subprocess.CalledProcessError:
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def compare(results, history_path, threshold, min_delta=MIN_DELTA):
+    """Compare results to the latest results of a different commit in the history
+
+    Parameters:
+    -----------
+    results : dict(str, dict(str, float))
+        wall time of every benchmark for every size
+    history_path : pathlib.Path
+        path to the history file
+    threshold : float
+        relative slowdown above which a benchmark is reported as a regression
+    min_delta : float (default: MIN_DELTA)
+        number of seconds a benchmark has to slow down by to be reported as a regression, so
+        that the noise of the fastest benchmarks is ignored
+
+    Returns:
+    --------
+    list(str)
+        descriptions of the regressions
+    """
+    commit = current_commit()
+    baseline = None
+    if history_path.is_file():
+        with history_path.open() as history_file:
+            for line in history_file:
+                entry = json.loads(line)
+                if entry["commit"] != commit:
+                    baseline = entry
+
+    if baseline is None:
+        return []
+
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, seconds in benchmarks.items():
+            previous = baseline["results"].get(size, {}).get(name)
+            if previous and seconds - previous > max(previous * threshold, min_delta):
+                regressions.append(f"{name} with {size} elements: {previous:.4f}s -> "
+                                   f"{seconds:.4f}s (baseline {baseline['commit'][:12]})")
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark the installer offline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="Numbers of elements of the generated lists")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Number of runs of the benchmarks of queries")
+    parser.add_argument("--install-size", type=int, default=8,
+                        help="Maximum number of elements installed by the installation benchmark")
+    parser.add_argument("--http", action="store_true", default=False,
+                        help="Serve the list of elements over HTTP instead of a file URL")
+    parser.add_argument("--history", type=pathlib.Path, default=HISTORY_FILE,
+                        help="File recording the results of every run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA,
+                        help="Slowdown in seconds under which no regression is reported")
+    parser.add_argument("--fail", action="store_true", default=False,
+                        help="Exit with a non-zero code if a regression is found")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_benchmarks(args.repeat, args.install_size)))
+        sys.exit()
+
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = benchmark_size(size, args.repeat, args.install_size, args.http)
+        print(f"{size} elements")
+        for name, seconds in results[str(size)].items():
+            print(f"    {name:<40}{seconds * 1000:>12.2f} ms")
+
+    regressions = compare(results, args.history, args.threshold, args.min_delta)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+
+    with args.history.open("a") as history_file:
+        history_file.write(json.dumps({
+            "commit": current_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "results": results,
+        }) + "\n")
+
+    sys.exit(1 if regressions and args.fail else 0)
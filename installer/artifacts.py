@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Artifact Cache
+
+This module packs built elements into archives and unpacks them on subsequent installs.
+
+Each archive is named after a key derived from everything that affects the build of the element,
+and holds a copy of the element directory along with metadata required to register the element.
+Archives are written to temporary files before being renamed into place, so the cache directory can
+be shared by multiple installers, e.g. on a filesystem shared by the nodes of a cluster.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tarfile
+import uuid
+
+METADATA_FILE = "metadata.json"
+
+
+def make_key(**fields):
+    """Derive the key of an artifact
+
+    Parameters:
+    -----------
+    **fields
+        JSON serializable values identifying the build of the element
+
+    Returns:
+    --------
+    str
+        SHA-256 digest of the fields
+    """
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def fetch(cache_dir, key, element_path):
+    """Unpack a cached artifact
+
+    Parameters:
+    -----------
+    cache_dir : str or pathlib.Path
+        directory of the artifact cache
+    key : str
+        key of the artifact
+    element_path : pathlib.Path
+        path to unpack the element directory to. The path must not exist.
+
+    Returns:
+    --------
+    dict or None
+        metadata stored along with the artifact, or None if the artifact is not cached
+    """
+    archive_path = pathlib.Path(cache_dir) / f"{key}.tar.gz"
+    if not archive_path.is_file():
+        return None
+
+    # unpack next to the destination so that the final rename does not cross filesystems
+    tmp_path = element_path.with_name(f".{element_path.name}.{uuid.uuid4().hex}")
+    try:
+        with tarfile.open(archive_path) as archive:
+            metadata = json.load(archive.extractfile(METADATA_FILE))
+            # archives from a shared cache are not trusted to stay inside the destination
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(tmp_path, filter="data")
+            else:
+                archive.extractall(tmp_path, members=__checked_members(archive, tmp_path))
+        os.rename(tmp_path / element_path.name, element_path)
+    except (OSError, tarfile.TarError, KeyError, ValueError):
+        return None
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return metadata
+
+
+def __checked_members(archive, path):
+    """Check that the members of an archive are extracted inside a directory
+
+    This is a fallback for the "data" extraction filter of `tarfile`, which is not available on
+    older versions of Python.
+
+    Parameters:
+    -----------
+    archive : tarfile.TarFile
+        archive to extract
+    path : pathlib.Path
+        directory the archive is extracted to
+
+    Raises:
+    -------
+    tarfile.TarError
+        member is not a regular file, directory or link, or a member or the target of a link is
+        outside of the directory
+
+    Returns:
+    --------
+    list(tarfile.TarInfo)
+        members of the archive
+    """
+    root = os.path.abspath(path)
+
+    def inside(name):
+        return os.path.commonpath([root, os.path.abspath(os.path.join(root, name))]) == root
+
+    members = archive.getmembers()
+    for member in members:
+        if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+            raise tarfile.TarError(f"{member.name} is not a regular file")
+        if os.path.isabs(member.name) or not inside(member.name):
+            raise tarfile.TarError(f"{member.name} is outside of the archive")
+        # symbolic links are relative to their directory, hard links to the archive
+        target = (os.path.join(os.path.dirname(member.name), member.linkname) if member.issym()
+                  else member.linkname)
+        if (member.issym() or member.islnk()) and (os.path.isabs(member.linkname)
+                                                   or not inside(target)):
+            raise tarfile.TarError(f"{member.name} links outside of the archive")
+    return members
+
+
+def store(cache_dir, key, element_path, metadata):
+    """Pack an element directory into the artifact cache
+
+    Parameters:
+    -----------
+    cache_dir : str or pathlib.Path
+        directory of the artifact cache
+    key : str
+        key of the artifact
+    element_path : pathlib.Path
+        path to the built element directory
+    metadata : dict
+        JSON serializable metadata to store along with the artifact
+    """
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    archive_path = cache_dir / f"{key}.tar.gz"
+    tmp_path = cache_dir / f".{key}.{uuid.uuid4().hex}"
+
+    metadata_path = tmp_path.with_name(f"{tmp_path.name}.json")
+    with metadata_path.open("w") as metadata_file:
+        json.dump(metadata, metadata_file)
+
+    try:
+        # compression is kept light since build trees are large and mostly binary
+        with tarfile.open(tmp_path, "w:gz", compresslevel=1) as archive:
+            archive.add(metadata_path, METADATA_FILE)
+            archive.add(element_path, element_path.name)
+        os.replace(tmp_path, archive_path)
+    finally:
+        metadata_path.unlink()
+        if tmp_path.exists():
+            tmp_path.unlink()
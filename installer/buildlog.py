@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Build Logs
+
+This module streams the output of the commands run while installing elements to log files.
+
+Every element gets a directory of logs with one file per phase of its installation, e.g. clone,
+configure and build. The output of the commands is read line by line as it is produced and every
+line is timestamped before being written, so the memory used does not depend on the size of the
+output. The last lines of the current phase are kept in a bounded buffer to be shown on failure,
+and lines can be echoed as they arrive to follow the installation live. The CPU time of the
+commands is accumulated per phase.
+
+Every command runs in its own session, so the whole tree of processes it spawns, e.g. the
+compilers run by make, is killed when a phase runs out of time or the installation is cancelled.
+"""
+import collections
+import datetime
+import os
+import pathlib
+import shutil
+import signal
+import subprocess
+import threading
+import time
+
+import timing
+
+LOG_DIR = pathlib.Path("element-logs")
+# number of lines shown when a phase fails
+TAIL_LINES = 20
+# seconds between checks for cancellation and timeouts while a command runs
+POLL_INTERVAL = 0.2
+# seconds given to a process group to terminate before it is killed
+KILL_GRACE = 5
+
+
+class ElementLog:
+    """Streaming logs of the phases of the installation of an element
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    log_dir : str or pathlib.Path (default: LOG_DIR)
+        directory holding the logs of all elements
+    tail_lines : int (default: TAIL_LINES)
+        number of lines of the current phase kept in memory
+    follow : callable(str, str, str) (default: None)
+        function called with the element, the phase and every line as it is logged
+    timeouts : dict(str, float) (default: None)
+        maximum number of seconds spent running the commands of each phase
+    cancel : threading.Event (default: None)
+        event set to kill the running command and fail the commands run afterwards
+    """
+
+    def __init__(self, element, log_dir=LOG_DIR, tail_lines=TAIL_LINES, follow=None,
+                 timeouts=None, cancel=None):
+
+        self.element = element
+        self.path = pathlib.Path(log_dir) / element
+        self.follow = follow
+        self.timeouts = timeouts or {}
+        self.cancel = cancel
+        self.phase = None
+        self.deadline = None
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.cpu_time = collections.Counter()
+        self.__lock = threading.Lock()
+
+    def phase_path(self, phase):
+        """Get path to the log of a phase
+
+        Parameters:
+        -----------
+        phase : str
+            name of phase
+
+        Returns:
+        --------
+        pathlib.Path
+            path to the log file
+        """
+        return self.path / f"{phase}.log"
+
+    def run(self, phase, cmd, **kwargs):
+        """Run a shell command and stream its output to the log of phase
+
+        The standard output and error of the command are merged in the log. The log of a phase is
+        truncated when the phase is first entered, and later commands of the same phase are
+        appended to it.
+
+        The process group of the command is terminated if the installation is cancelled or the
+        phase runs past its timeout, in which case the reason is logged as the last line of the
+        phase and a negative exit code is returned.
+
+        Parameters:
+        -----------
+        phase : str
+            name of phase
+        cmd : str
+            shell command to run
+        **kwargs
+            keyword arguments passed to `subprocess.Popen`
+
+        Returns:
+        --------
+        int
+            exit code of the command
+        """
+        with self.__lock:
+            mode = "a" if phase == self.phase else "w"
+            if phase != self.phase:
+                self.phase = phase
+                self.tail.clear()
+                # the timeout of a phase covers all of its commands
+                timeout = self.timeouts.get(phase)
+                self.deadline = time.monotonic() + timeout if timeout else None
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self.phase_path(phase).open(mode, buffering=1) as log_file:
+            log_file.write(f"{self.__timestamp()} $ {cmd}\n")
+            reason = self.__interruption(phase)
+            if reason:
+                self.__append(log_file, phase, reason)
+                return -signal.SIGTERM
+
+            with subprocess.Popen(cmd, shell=True, stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  errors="replace", start_new_session=True,
+                                  **kwargs) as process:
+                finished = threading.Event()
+                reasons = []
+                watcher = None
+                if self.cancel or self.deadline:
+                    watcher = threading.Thread(target=self.__watch, daemon=True,
+                                               args=(process, phase, finished, reasons))
+                    watcher.start()
+                try:
+                    for line in process.stdout:
+                        self.__append(log_file, phase, line.rstrip("\n"))
+                    cpu_time = timing.wait(process)
+                finally:
+                    finished.set()
+                    if watcher:
+                        watcher.join()
+
+            for reason in reasons:
+                self.__append(log_file, phase, reason)
+
+        with self.__lock:
+            self.cpu_time[phase] += cpu_time
+
+        return process.returncode
+
+    def __append(self, log_file, phase, line):
+
+        log_file.write(f"{self.__timestamp()} {line}\n")
+        with self.__lock:
+            self.tail.append(line)
+        if self.follow:
+            self.follow(self.element, phase, line)
+
+    def __interruption(self, phase):
+
+        if self.cancel and self.cancel.is_set():
+            return "Cancelled"
+        if self.deadline and time.monotonic() > self.deadline:
+            return f"{phase.capitalize()} timed out after {self.timeouts[phase]} s"
+        return None
+
+    def __watch(self, process, phase, finished, reasons):
+
+        while not finished.wait(POLL_INTERVAL):
+            reason = self.__interruption(phase)
+            if not reason:
+                continue
+            reasons.append(reason)
+
+            # the output pipe is closed once every process of the group is gone
+            for sig, grace in ((signal.SIGTERM, KILL_GRACE), (signal.SIGKILL, None)):
+                try:
+                    os.killpg(process.pid, sig)
+                except ProcessLookupError:
+                    return
+                if finished.wait(grace):
+                    return
+            return
+
+    def get_tail(self):
+        """Get the last lines logged in the current phase
+
+        Returns:
+        --------
+        list(str)
+            last lines of the current phase
+        """
+        with self.__lock:
+            return list(self.tail)
+
+    def remove(self):
+        """Remove all logs of the element"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    @staticmethod
+    def __timestamp():
+
+        return datetime.datetime.now().isoformat(sep=" ", timespec="milliseconds")
@@ -2,8 +2,14 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import os
+import signal
+import sys
+import threading
 
+import daemon
 import installer
+import progress
 
 
 if __name__ == "__main__":
@@ -20,14 +26,36 @@ if __name__ == "__main__":
             args_string = self._format_args(action, default)
             return ", ".join(action.option_strings) + " " + args_string
 
+    class VersionAction(argparse.Action):
+
+        # the version of SST is only gathered when requested, since it requires a subprocess
+        def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS,
+                     help=None):
+            super().__init__(option_strings, dest=dest, default=default, nargs=0, help=help)
+
+        def __call__(self, parser, namespace, values, option_string=None):
+            print(installer.get_version(), end="")
+            parser.exit()
+
+    def phase_timeout(value):
+        # a timeout without a phase applies to every phase
+        phase, _, seconds = value.rpartition("=")
+        phases = (phase,) if phase else ("clone", "configure", "build")
+        if not set(phases) <= {"clone", "configure", "build"}:
+            raise argparse.ArgumentTypeError(f"invalid phase: {phase}")
+        try:
+            return {_phase: float(seconds) for _phase in phases}
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid number of seconds: {seconds}") from None
+
     parser = argparse.ArgumentParser(description=installer.__doc__,
                                      formatter_class=CustomHelpFormatter, add_help=False)
 
     install_parser = parser.add_argument_group("Installation arguments")
-    install_parser.add_argument("install", nargs="?", metavar="<ELEMENT>", type=str, default="",
-                                help="Install element along with its dependencies.")
-    install_parser.add_argument("--uninstall", "-u", metavar="<ELEMENT>", type=str, default="",
-                                help="Uninstall element.")
+    install_parser.add_argument("install", nargs="*", metavar="<ELEMENT>", type=str, default=[],
+                                help="Install elements along with their dependencies.")
+    install_parser.add_argument("--uninstall", "-u", nargs="+", metavar="<ELEMENT>", type=str,
+                                default=[], help="Uninstall elements.")
 
     # build options
     install_parser.add_argument("--gen", "-g", nargs="?", metavar="Makefile|Ninja", type=str,
@@ -35,9 +63,27 @@ if __name__ == "__main__":
                                 help="""Generator to build element.
                                 Argument is case insensitive. (default: %(default)s)""")
     install_parser.add_argument("--jobs", "-j", nargs="?", metavar="<JOBS>", type=int, default=1,
-                                help="Maximum number of parallel builds. (default: %(default)s)")
+                                help="""Maximum number of parallel jobs shared by the builds.
+                                Without a number, the jobs are sized from the CPUs and memory
+                                available. (default: %(default)s)""")
     install_parser.add_argument("--dump", "-d", action="store_false", default=True,
-                                help="Dump logs captured during the installation process.")
+                                help="""Keep the logs of every element under element-logs. By
+                                default, only the logs of failed elements are kept.""")
+    install_parser.add_argument("--follow", "-F", action="store_true", default=False,
+                                help="Print the output of the clones and builds as they run.")
+
+    install_parser.add_argument("--compiler-cache", "-C", metavar="<CACHE>",
+                                type=str.lower, default=None, choices=("ccache", "sccache"),
+                                help="""Compiler cache to launch the compilers with. Supported
+                                 caches are ccache and sccache.""")
+    install_parser.add_argument("--compiler-cache-dir", metavar="<DIR>", type=str, default=None,
+                                help="Directory of the compiler cache.")
+    install_parser.add_argument("--compiler-cache-size", metavar="<SIZE>", type=str, default=None,
+                                help="Size limit of the compiler cache, e.g. 10G.")
+
+    install_parser.add_argument("--artifact-cache", "-a", metavar="<DIR>", type=str, default=None,
+                                help="""Directory of the cache of built elements. Cached elements
+                                 are unpacked instead of being cloned and built.""")
 
     # download options
     install_parser.add_argument("--branch", "-b", metavar="<BRANCH>", type=str, default="master",
@@ -48,6 +94,26 @@ if __name__ == "__main__":
                                 help="""Commit SHA of element repository. By default, the installer
                                  will clone the version of the repository at its head.""")
 
+    install_parser.add_argument("--clone", "-s", metavar="full|shallow|partial", type=str.lower,
+                                default="full", choices=("full", "shallow", "partial"),
+                                help="""Clone strategy. A shallow clone downloads only the head of
+                                 the branch or the pinned commit. A partial clone downloads the
+                                 history but fetches file contents on demand.
+                                 (default: %(default)s)""")
+
+    install_parser.add_argument("--no-mirror", action="store_false", dest="mirror", default=True,
+                                help="""Clone directly from the element repository instead of its
+                                 local mirror. Shallow and partial clones never use the
+                                 mirror.""")
+
+    install_parser.add_argument("--update", "-U", action="store_true", default=False,
+                                help="""Flag to update installed elements in place. The existing
+                                 builds are reused so that only the changed files are rebuilt.""")
+    install_parser.add_argument("--timeout", metavar="[<PHASE>=]<SECONDS>",
+                                type=phase_timeout, action="append", default=[],
+                                help="""Maximum time spent by an element in a phase, i.e. clone,
+                                 configure or build. Without a phase, the timeout applies to every
+                                 phase. Can be repeated.""")
     install_parser.add_argument("--force", "-f", action="store_true", default=False,
                                 help="""Flag to force installation or removal of element.
                         If option is applied to installation, the existing files will be
@@ -70,11 +136,22 @@ if __name__ == "__main__":
     option_parser = parser.add_argument_group("Optional arguments")
     option_parser.add_argument("-h", "--help", action="help", default=argparse.SUPPRESS,
                                help="Show this help message and exit")
-    option_parser.add_argument("-v", "--version", action="version",
-                               version=installer.get_version(),
+    option_parser.add_argument("-v", "--version", action=VersionAction,
                                help="Show version number and exit")
     option_parser.add_argument("--quiet", "-q", action="store_true", default=False,
-                               help="Suppress standard outputs")
+                               help="""Suppress standard outputs. On a terminal, a progress bar
+                        with the estimated time left is shown unless the output is quiet or
+                        followed.""")
+    option_parser.add_argument("--refresh", action="store_true", default=False,
+                               help="Revalidate the cached list of elements")
+    option_parser.add_argument("--no-cache", action="store_true", default=False,
+                               help="Bypass the cached list of elements")
+    option_parser.add_argument("--no-daemon", action="store_false", dest="daemon", default=True,
+                               help="Run in process even if the installer daemon is running")
+    # the path is resolved before the installer moves to the directory of element sources
+    option_parser.add_argument("--trace", metavar="<FILE>", type=os.path.abspath, default=None,
+                               help="""Export the time spent in every phase of the installation
+                               as Chrome trace events""")
 
     args = parser.parse_args().__dict__
 
@@ -82,34 +159,81 @@ if __name__ == "__main__":
         # suppress all console outputs
         installer.LOG = False
 
+    if args["no_cache"]:
+        installer.CACHE = False
+    elif args["refresh"]:
+        # revalidate on first use, after which the list is reused for the rest of the command
+        installer.CACHE_TTL = 0
+
+    # requests are sent to the installer daemon if it is running, unless its caches are bypassed
+    backend = (daemon.Client() if args["daemon"] and not (args["refresh"] or args["no_cache"])
+               else installer)
+
+    # a progress bar is drawn in place of the output of the commands on terminals
+    console_progress = (progress.ConsoleProgress()
+                        if sys.stderr.isatty() and not (args["quiet"] or args["follow"]) else None)
+
     try:
         if args["install"]:
-            installer.install(
-                element=args["install"],
+            # the first interrupt cancels the installation and rolls it back, the next one aborts
+            cancel = threading.Event()
+
+            def interrupt(signum, frame):
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                # written directly, since the interrupted thread may be printing
+                os.write(sys.stderr.fileno(), b"\nCancelling installation...\n")
+                cancel.set()
+
+            signal.signal(signal.SIGINT, interrupt)
+            returncode = backend.install(
+                elements=args["install"],
                 force=args["force"],
                 generator=args["gen"].lower(),
                 n_jobs=args["jobs"],
                 branch=args["branch"],
                 commit=args["commit"],
-                suppress_dump=args["dump"]
+                suppress_dump=args["dump"],
+                clone_mode=args["clone"],
+                mirror=args["mirror"],
+                update=args["update"],
+                compiler_cache=args["compiler_cache"],
+                compiler_cache_dir=args["compiler_cache_dir"],
+                compiler_cache_size=args["compiler_cache_size"],
+                artifact_cache=args["artifact_cache"],
+                follow=args["follow"],
+                timeouts={phase: seconds for timeout in args["timeout"]
+                          for phase, seconds in timeout.items()},
+                cancel=cancel,
+                trace=args["trace"],
+                progress=console_progress
             )
+            if cancel.is_set():
+                raise SystemExit(130)
+            # elements failed, timed out or were already installed
+            if returncode:
+                raise SystemExit(1)
 
         elif args["uninstall"]:
-            installer.uninstall(
-                element=args["uninstall"],
-                force=args["force"]
-            )
+            # uninstall returns 1 on success for the GUI
+            if backend.uninstall(
+                elements=args["uninstall"],
+                force=args["force"],
+                trace=args["trace"],
+                progress=console_progress
+            ) == 2:
+                raise SystemExit(1)
 
         elif args["dep"]:
-            dep = installer.get_dependencies(args["dep"])
+            dep = backend.get_dependencies(args["dep"])
             print("\n".join(dep) if dep else None)
 
         elif args["list"]:
-            all_elements = installer.list_all_elements().keys()
+            all_elements = backend.list_all_elements().keys()
+            registered = set(backend.list_registered_elements())
             print("SST Elements".ljust(25), "Registered")
             print("-" * 41)
             for element in all_elements:
-                if installer.is_registered(element):
+                if element in registered:
                     # print check mark (✓)
                     print(f"{element.ljust(28)} \033[32m✓\033[0m")
                 else:
@@ -117,12 +241,12 @@ if __name__ == "__main__":
 
         elif args["registered"]:
             if args["registered"] == "all":
-                print("\n".join(installer.list_registered_elements()))
+                print("\n".join(backend.list_registered_elements()))
             else:
-                print(installer.is_registered(args["registered"]))
+                print(backend.is_registered(args["registered"]))
 
         elif args["info"]:
-            print("\n".join(installer.get_info(args["info"])))
+            print("\n".join(backend.get_info(args["info"])))
 
         elif args["tests"]:
             test_list = installer.list_tests(args["tests"])
@@ -133,3 +257,7 @@ if __name__ == "__main__":
 
     except Exception as exc:
         raise SystemExit(exc) from None
+
+    finally:
+        if console_progress:
+            console_progress.clear()
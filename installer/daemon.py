@@ -0,0 +1,645 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Installer Daemon
+
+This script runs the installer as a long-running process serving requests over a Unix socket.
+
+The daemon keeps the list of elements, the snapshot of the registry and the dependency graph in
+memory between requests, and refreshes the list along with the local mirrors of the repositories in
+the background. Queries are answered concurrently, while installations and uninstallations are
+queued and run one at a time. A request identical to one already queued or running is attached to
+it instead of being queued again, so users of a shared node requesting the same elements share a
+single installation.
+
+Requests and responses are JSON objects sent one per line. A request names the installer function
+to call along with its keyword arguments:
+    {"operation": "install", "kwargs": {"elements": ["zodiac"], "n_jobs": 4}}
+
+Queries are answered with a single message holding the result or the error raised:
+    {"result": ...}
+    {"error": "FileNotFoundError", "message": "zodiac not found"}
+
+Only the keyword arguments listed in `KWARGS` are accepted, and only elements of the official list
+can be installed or uninstalled. Jobs are built with the environment of the daemon, so clients send
+a description of their toolchain along with installations, which are refused if it differs.
+
+Installations and uninstallations also stream the lines logged and the progress events before their
+result. Sending {"operation": "cancel"} cancels the installation unless other clients requested it
+too, and so does closing the connection before the result is received:
+    {"log": "[INSTALL] Installing zodiac..."}
+    {"progress": ["zodiac", "build", 12, 340, "Building CXX object ..."]}
+    {"result": 0, "installed": "Installed zodiac"}
+
+Usage:
+    python daemon.py [--socket <PATH>]
+"""
+import argparse
+import builtins
+import contextlib
+import functools
+import inspect
+import json
+import os
+import pathlib
+import queue
+import shutil
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import urllib.error
+
+import installer
+import progress
+
+SOCKET_PATH = pathlib.Path(os.path.abspath(
+    os.environ.get("ELEMENT_DAEMON_SOCKET")
+    or os.path.join(os.environ.get("ELEMENT_SRC_DIR") or ".", ".installer.sock")
+))
+# functions answered concurrently
+QUERIES = ("list_all_elements", "list_registered_elements", "is_registered", "get_dependencies",
+           "get_info", "get_info_many", "get_version")
+# functions queued and run one at a time
+JOBS = ("install", "uninstall")
+# keyword arguments accepted from clients. Paths the daemon would write to, such as traces and
+# caches, are left to the configuration of the daemon.
+KWARGS = {
+    "list_all_elements": ("refresh",),
+    "list_registered_elements": (),
+    "is_registered": ("element",),
+    "get_dependencies": ("element",),
+    "get_info": ("element",),
+    "get_info_many": ("elements",),
+    "get_version": (),
+    "install": ("element", "elements", "force", "generator", "n_jobs", "branch", "commit",
+                "suppress_dump", "clone_mode", "mirror", "update", "compiler_cache",
+                "compiler_cache_size", "follow", "timeouts", "toolchain"),
+    "uninstall": ("element", "elements", "force"),
+}
+# types of the keyword arguments, which may also be None
+KWARG_TYPES = {
+    "refresh": bool, "element": str, "elements": list, "force": bool, "generator": str,
+    "n_jobs": int, "branch": str, "commit": str, "suppress_dump": bool, "clone_mode": str,
+    "mirror": bool, "update": bool, "compiler_cache": str, "compiler_cache_size": (str, int),
+    "follow": bool, "timeouts": dict, "toolchain": dict,
+}
+# build tools resolved on the PATH and variables of the environment that select the toolchain
+TOOLS = (("CC", "cc"), ("CXX", "c++"), ("CMAKE", "cmake"))
+FLAGS = ("CFLAGS", "CXXFLAGS", "CPPFLAGS", "LDFLAGS", "CMAKE_PREFIX_PATH")
+# seconds between checks for cancellation while a client waits for a job
+POLL_INTERVAL = 0.2
+# seconds between refreshes of the list of elements and the mirrors
+REFRESH_INTERVAL = installer.CACHE_TTL
+
+
+def toolchain(environ=os.environ):
+    """Describe the toolchain selected by an environment
+
+    Parameters:
+    -----------
+    environ : dict(str, str) (default: os.environ)
+        environment of a process
+
+    Returns:
+    --------
+    dict(str, str)
+        resolved path of every build tool and value of every flag set
+    """
+    tools = {}
+    for var, default in TOOLS:
+        tool = environ.get(var, default)
+        path = shutil.which(tool, path=environ.get("PATH"))
+        tools[var] = os.path.realpath(path) if path else tool
+    return {**tools, **{var: environ[var] for var in FLAGS if var in environ}}
+
+
+def check_request(operation, kwargs):
+    """Check the keyword arguments of a request
+
+    Any user sharing the group of the daemon can send requests, so only the arguments listed in
+    `KWARGS` are accepted and installations and uninstallations are restricted to the official list
+    of elements. Jobs are built with the environment of the daemon, so an installation is refused
+    if the toolchain of the client differs from the toolchain of the daemon.
+
+    Parameters:
+    -----------
+    operation : str
+        name of the installer function
+    kwargs : dict
+        keyword arguments of the function
+
+    Raises:
+    -------
+    ValueError
+        argument is not accepted or has an invalid type, or the toolchains differ
+    FileNotFoundError
+        requested element does not exist
+
+    Returns:
+    --------
+    dict
+        keyword arguments to call the function with
+    """
+    if not isinstance(kwargs, dict):
+        raise ValueError("Invalid request")
+
+    kwargs = dict(kwargs)
+    for name, value in kwargs.items():
+        if name not in KWARGS[operation]:
+            raise ValueError(f"{name} is not accepted by the installer daemon")
+        if value is not None and (not isinstance(value, KWARG_TYPES[name])
+                                  or KWARG_TYPES[name] is int and isinstance(value, bool)):
+            raise ValueError(f"Invalid {name}: {value!r}")
+
+    if operation in JOBS:
+        all_elements = installer.list_all_elements()
+        for _element in [kwargs.get("element")] + list(kwargs.get("elements") or []):
+            if _element and (not isinstance(_element, str) or _element not in all_elements):
+                raise FileNotFoundError(f"{_element} not found")
+
+    client_toolchain = kwargs.pop("toolchain", None)
+    if client_toolchain is not None:
+        daemon_toolchain = toolchain()
+        differences = sorted(var for var in set(client_toolchain) | set(daemon_toolchain)
+                             if client_toolchain.get(var) != daemon_toolchain.get(var))
+        if differences:
+            raise ValueError(f"The installer daemon builds with a different toolchain "
+                             f"({', '.join(differences)}). Use --no-daemon to build with yours.")
+    return kwargs
+
+
+def encode_error(exc):
+    """Describe an exception as a message
+
+    Parameters:
+    -----------
+    exc : Exception
+        exception raised by an installer function
+
+    Returns:
+    --------
+    dict(str, str)
+        name of the type of the exception and its message
+    """
+    return {"error": type(exc).__name__,
+            "message": str(exc.args[0]) if len(exc.args) == 1 else str(exc)}
+
+
+def decode_error(message):
+    """Recreate an exception described by a message
+
+    Exceptions of built-in types and `urllib.error.URLError` are recreated as such, and any other
+    exception as a `RuntimeError`.
+
+    Parameters:
+    -----------
+    message : dict(str, str)
+        name of the type of the exception and its message
+
+    Returns:
+    --------
+    Exception
+        exception to raise
+    """
+    if message["error"] in ("URLError", "HTTPError"):
+        return urllib.error.URLError(message["message"])
+
+    exc_type = getattr(builtins, message["error"], None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        return exc_type(message["message"])
+    return RuntimeError(f"{message['error']}: {message['message']}")
+
+
+class Job:
+    """Installation or uninstallation requested by one or more clients
+
+    Parameters:
+    -----------
+    operation : str
+        name of the installer function
+    kwargs : dict
+        keyword arguments of the function
+    """
+
+    def __init__(self, operation, kwargs):
+
+        self.operation = operation
+        self.kwargs = kwargs
+        self.cancel = threading.Event()
+        self.done = threading.Event()
+        self.messages = []
+        self.subscribers = []
+        self.__lock = threading.Lock()
+
+    def publish(self, message, keep=True):
+        """Send a message to every client of the job
+
+        Parameters:
+        -----------
+        message : dict
+            message to send
+        keep : bool (default: True)
+            flag to replay the message to clients attaching to the job later
+        """
+        with self.__lock:
+            if keep:
+                self.messages.append(message)
+            subscribers = list(self.subscribers)
+
+        for send in subscribers:
+            # the connection of a client may be closed at any time
+            try:
+                send(message)
+            except (OSError, ValueError):
+                self.leave(send)
+
+    def attach(self, send):
+        """Attach a client to the job, which receives the messages published so far
+
+        Parameters:
+        -----------
+        send : callable(dict)
+            function sending a message to the client
+        """
+        with self.__lock:
+            for message in self.messages:
+                send(message)
+            self.subscribers.append(send)
+
+    def leave(self, send, cancel=False):
+        """Detach a client from the job
+
+        The job is cancelled once no client is left to wait for it.
+
+        Parameters:
+        -----------
+        send : callable(dict)
+            function sending a message to the client
+        cancel : bool (default: False)
+            flag set if the client asked for cancellation, in which case it stays attached to
+            receive the result of the job unless other clients are waiting for the job
+
+        Returns:
+        --------
+        bool
+            if the client is still attached to the job
+        """
+        with self.__lock:
+            if send not in self.subscribers:
+                return False
+            if cancel and self.subscribers == [send]:
+                self.cancel.set()
+                return True
+
+            self.subscribers.remove(send)
+            if not (self.subscribers or self.done.is_set()):
+                self.cancel.set()
+            return False
+
+
+class LineWriter:
+    """File-like object passing the lines written to it to a function
+
+    Parameters:
+    -----------
+    write_line : callable(str)
+        function called with every line written
+    """
+
+    def __init__(self, write_line):
+
+        self.write_line = write_line
+        self.__buffer = ""
+        self.__lock = threading.Lock()
+
+    def write(self, text):
+
+        with self.__lock:
+            *lines, self.__buffer = (self.__buffer + text).split("\n")
+        for line in lines:
+            self.write_line(line)
+        return len(text)
+
+    def flush(self):
+
+        pass
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def setup(self):
+
+        super().setup()
+        self.__lock = threading.Lock()
+
+    def send(self, message):
+
+        with self.__lock:
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    def handle(self):
+
+        try:
+            request = json.loads(self.rfile.readline())
+            operation, kwargs = request["operation"], request.get("kwargs", {})
+        except (ValueError, KeyError, TypeError):
+            self.send(encode_error(ValueError("Invalid request")))
+            return
+
+        if operation not in QUERIES + JOBS:
+            self.send(encode_error(NotImplementedError(f"{operation} is not supported")))
+            return
+
+        try:
+            kwargs = check_request(operation, kwargs)
+            if operation in QUERIES:
+                self.send({"result": getattr(installer, operation)(**kwargs)})
+                return
+        except Exception as exc:
+            self.send(encode_error(exc))
+            return
+
+        job = self.server.submit(operation, kwargs)
+        job.attach(self.send)
+        attached = True
+        # the connection is closed by the client once it receives the result
+        for line in self.rfile:
+            cancel = False
+            with contextlib.suppress(ValueError, AttributeError):
+                cancel = json.loads(line).get("operation") == "cancel"
+            if attached and cancel:
+                attached = job.leave(self.send, cancel=True)
+                if not attached:
+                    self.send({"log": f"[REQUEST] {operation.capitalize()} still requested by "
+                                      f"other clients"})
+                    self.send({"result": 2})
+        if attached:
+            job.leave(self.send)
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Server running installer functions requested over a Unix domain socket
+
+    Parameters:
+    -----------
+    path : str or pathlib.Path (default: SOCKET_PATH)
+        path of the socket
+    refresh_interval : float (default: REFRESH_INTERVAL)
+        number of seconds between refreshes of the list of elements and the mirrors
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=SOCKET_PATH, refresh_interval=REFRESH_INTERVAL):
+
+        self.path = pathlib.Path(path)
+        self.refresh_interval = refresh_interval
+        # a socket left by a daemon that did not exit cleanly is replaced
+        if self.path.exists():
+            if is_running(self.path):
+                raise OSError(f"Installer daemon already running on {self.path}")
+            self.path.unlink()
+
+        super().__init__(str(self.path), RequestHandler)
+        # users sharing the group of the daemon can submit requests
+        os.chmod(self.path, 0o660)
+
+        self.jobs = {}
+        self.queue = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        threading.Thread(target=self.__work, name="jobs", daemon=True).start()
+        threading.Thread(target=self.__refresh, name="refresh", daemon=True).start()
+
+    def submit(self, operation, kwargs):
+        """Queue a job, or find the identical job already queued or running
+
+        Parameters:
+        -----------
+        operation : str
+            name of the installer function
+        kwargs : dict
+            keyword arguments of the function
+
+        Returns:
+        --------
+        Job
+            job running the function
+        """
+        key = json.dumps([operation, kwargs], sort_keys=True)
+        with self.__lock:
+            job = self.jobs.get(key)
+            if job is None or job.cancel.is_set():
+                job = self.jobs[key] = Job(operation, kwargs)
+                self.queue.put((key, job))
+        return job
+
+    def __work(self):
+
+        while True:
+            key, job = self.queue.get()
+            if job.cancel.is_set():
+                job.publish({"result": 2})
+            else:
+                self.__run(job)
+
+            with self.__lock:
+                if self.jobs.get(key) is job:
+                    del self.jobs[key]
+            job.done.set()
+
+    def __run(self, job):
+
+        kwargs = dict(job.kwargs)
+        if job.operation in JOBS:
+            kwargs["progress"] = lambda event: job.publish({"progress": list(event)}, keep=False)
+        if job.operation == "install":
+            kwargs["cancel"] = job.cancel
+
+        # the lines logged by the job are sent to its clients, unlike those of concurrent queries
+        try:
+            with installer.redirect_log(LineWriter(lambda line: job.publish({"log": line}))):
+                result = getattr(installer, job.operation)(**kwargs)
+        except Exception as exc:
+            job.publish(encode_error(exc))
+        else:
+            job.publish({"result": result, "installed": installer.INSTALLED_ELEMS})
+
+    def __refresh(self):
+
+        # the first refresh warms the caches before any request is received
+        while True:
+            try:
+                installer.list_all_elements(refresh=True)
+                installer.list_registered_elements()
+            except Exception as exc:
+                log(f"Refreshing the list of elements failed: {exc}")
+
+            # mirrors are updated between jobs, so the jobs are not slowed down
+            self.submit("update_mirrors", {}).attach(
+                lambda message: log(message["log"], level=None) if "log" in message else None
+            )
+            if self.__stopped.wait(self.refresh_interval):
+                return
+
+    def server_close(self):
+
+        self.__stopped.set()
+        super().server_close()
+        with contextlib.suppress(OSError):
+            self.path.unlink()
+
+
+def log(message, level="DAEMON"):
+    """Print a message of the daemon
+
+    The message is printed to the standard output of the daemon, which is not sent to the clients
+    of the job running.
+
+    Parameters:
+    -----------
+    message : str
+        message to print
+    level : str (default: "DAEMON")
+        logging info level, or None to print the message as is
+    """
+    print(f"[{level}] {message}" if level else message, flush=True)
+
+
+def is_running(path=SOCKET_PATH):
+    """Check if a daemon is listening on a socket
+
+    Parameters:
+    -----------
+    path : str or pathlib.Path (default: SOCKET_PATH)
+        path of the socket
+
+    Returns:
+    --------
+    bool
+        if a daemon accepts connections on the socket
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+class Client:
+    """Proxy of the installer running its functions in the daemon
+
+    The functions of the installer are accessed as attributes of the client. Every call is sent to
+    the daemon if it is running and is run in process otherwise. Functions not served by the daemon,
+    and calls with arguments not accepted by the daemon, e.g. the path of a trace, always run in
+    process.
+
+    Parameters:
+    -----------
+    path : str or pathlib.Path (default: SOCKET_PATH)
+        path of the socket of the daemon
+    """
+
+    def __init__(self, path=SOCKET_PATH):
+
+        self.path = pathlib.Path(path)
+
+    def __getattr__(self, name):
+
+        function = getattr(installer, name)
+        if name not in QUERIES + JOBS:
+            return function
+
+        @functools.wraps(function)
+        def call(*args, progress=None, cancel=None, trace=None, **kwargs):
+
+            # arguments are sent by name
+            arguments = {argument: value for argument, value
+                         in inspect.signature(function).bind(*args, **kwargs).arguments.items()
+                         if value is not None}
+
+            # traces and caches are written to the paths of the caller in process
+            connection = None
+            if not trace and set(arguments) <= set(KWARGS[name]):
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    connection.connect(str(self.path))
+                except OSError:
+                    connection.close()
+                    connection = None
+
+            if connection is None:
+                if name in JOBS:
+                    kwargs.update(progress=progress, trace=trace)
+                if name == "install":
+                    kwargs.update(cancel=cancel)
+                return getattr(installer, name)(*args, **kwargs)
+
+            if name == "install":
+                arguments["toolchain"] = toolchain()
+            with connection:
+                return self.__request(connection, name, arguments, progress, cancel)
+
+        return call
+
+    @staticmethod
+    def __request(connection, operation, kwargs, progress_callback=None, cancel=None):
+
+        connection.sendall(json.dumps({"operation": operation, "kwargs": kwargs}).encode("utf-8")
+                           + b"\n")
+        connection.settimeout(POLL_INTERVAL if cancel else None)
+
+        buffer = b""
+        cancelled = False
+        while True:
+            if cancel and cancel.is_set() and not cancelled:
+                connection.sendall(b'{"operation": "cancel"}\n')
+                cancelled = True
+            try:
+                chunk = connection.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                raise ConnectionError("Installer daemon closed the connection")
+
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                message = json.loads(line)
+                if "log" in message:
+                    if installer.LOG:
+                        # a progress bar drawn on the terminal is redrawn by the next event
+                        if hasattr(progress_callback, "clear"):
+                            progress_callback.clear()
+                        print(message["log"])
+                elif "progress" in message:
+                    if progress_callback:
+                        progress_callback(progress.ProgressEvent(*message["progress"]))
+                elif "error" in message:
+                    raise decode_error(message)
+                else:
+                    if "installed" in message:
+                        installer.INSTALLED_ELEMS = message["installed"]
+                    return message["result"]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve the SST Elements Installer over a socket")
+    parser.add_argument("--socket", metavar="<PATH>", type=os.path.abspath, default=SOCKET_PATH,
+                        help="Path of the socket (default: %(default)s)")
+    args = parser.parse_args()
+
+    # the socket is removed when the daemon is stopped
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        with Daemon(args.socket) as daemon:
+            log(f"Listening on {daemon.path}")
+            daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        sys.exit(exc)
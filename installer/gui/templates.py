@@ -1,12 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import os
+import pathlib
 import urllib.request
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-from .spinner import QtWaitingSpinner
 import installer
+import progress
+
+ICON_URL = "http://sst-simulator.org/img/sst-logo-small.png"
+# the downloaded icon is cached under CACHE_DIR
+ICON_FILE = "sst-logo-small.png"
 
 
 class RunnableAction(QtCore.QRunnable):
@@ -23,21 +29,69 @@ class RunnableAction(QtCore.QRunnable):
         QtCore.QMetaObject.invokeMethod(
             self.window, "stop",
             QtCore.Qt.QueuedConnection,
-            QtCore.Q_ARG(int, self.action(element=self.element, force=True, **self.args))
+            QtCore.Q_ARG(int, self.action(element=self.element, force=True,
+                                          progress=self.window.progressed.emit, **self.args))
         )
 
 
+class QuerySignals(QtCore.QObject):
+
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+
+
+class RunnableQuery(QtCore.QRunnable):
+    """Run a blocking installer call on the global thread pool
+
+    The signals are created on the GUI thread, so slots connected to them run on the GUI thread once
+    the call returns.
+    """
+
+    def __init__(self, query, *args, **kwargs):
+
+        QtCore.QRunnable.__init__(self)
+        self.query = query
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = QuerySignals()
+
+    def run(self):
+
+        try:
+            result = self.query(*self.args, **self.kwargs)
+        except Exception as exc:
+            self.signals.failed.emit(exc)
+        else:
+            self.signals.finished.emit(result)
+
+
+def run_query(query, on_finished, on_failed=None, *args, **kwargs):
+
+    runnable = RunnableQuery(query, *args, **kwargs)
+    runnable.signals.finished.connect(on_finished)
+    if on_failed:
+        runnable.signals.failed.connect(on_failed)
+    QtCore.QThreadPool.globalInstance().start(runnable)
+    return runnable
+
+
 class SplashScreen(QtWidgets.QDialog):
 
+    # progress events are emitted from the worker threads and handled on the GUI thread
+    progressed = QtCore.pyqtSignal(object)
+
     def __init__(self, parent, element, action, **action_args):
 
         super(SplashScreen, self).__init__(None)
-        self.resize(200, 100)
+        self.resize(400, 100)
 
         self.parent = parent
         self.element = element
         self.action = action
         self.action_args = action_args
+        # actions given a cancellation event can be cancelled from the dialog
+        self.cancel = action_args.get("cancel")
+        self.estimator = progress.Estimator()
         self.__layout = QtWidgets.QVBoxLayout()
 
         self.setLayout(self.__layout)
@@ -47,22 +101,77 @@ class SplashScreen(QtWidgets.QDialog):
         header_label.setAlignment(QtCore.Qt.AlignCenter | QtCore.Qt.AlignVCenter)
         self.layout().addWidget(header_label)
 
-        self.__spinner = QtWaitingSpinner(self)
-        self.layout().addWidget(self.__spinner)
+        # overall progress across elements, and progress of the latest phase of an element
+        self.overall_bar = QtWidgets.QProgressBar()
+        self.overall_bar.setRange(0, 0)
+        self.layout().addWidget(self.overall_bar)
+
+        self.status_label = QtWidgets.QLabel()
+        self.layout().addWidget(self.status_label)
+
+        self.phase_bar = QtWidgets.QProgressBar()
+        self.phase_bar.setRange(0, 0)
+        self.layout().addWidget(self.phase_bar)
 
-        self.__spinner.start()
+        if self.cancel:
+            self.cancel_btn = QtWidgets.QPushButton("Cancel")
+            self.cancel_btn.clicked.connect(self.on_cancel)
+            self.layout().addWidget(self.cancel_btn)
+
+        self.progressed.connect(self.on_progress)
         QtCore.QThreadPool.globalInstance().start(
             RunnableAction(self, self.action, self.element, **self.action_args)
         )
 
+    def on_progress(self, event):
+
+        eta = progress.format_eta(self.estimator.eta(event))
+        if event.element is None:
+            self.overall_bar.setRange(0, event.total)
+            self.overall_bar.setValue(event.current)
+            self.overall_bar.setFormat(f"%v/%m elements (ETA {eta})")
+            return
+
+        if event.total:
+            self.phase_bar.setRange(0, event.total)
+            self.phase_bar.setValue(min(event.current, event.total))
+            self.phase_bar.setFormat(f"%p% (ETA {eta})")
+        else:
+            # phase started or finished, its progress is unknown until its commands report it
+            self.phase_bar.setRange(0, 0)
+        self.status_label.setText(
+            f"{event.phase.capitalize()} {event.element} {event.message}"[:80]
+        )
+
+    def on_cancel(self):
+
+        # the running commands are killed and the installation is rolled back before it returns
+        self.cancel.set()
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("Cancelling...")
+
+    def reject(self):
+
+        # closing the dialog cancels the action instead of hiding it while it runs
+        if self.cancel:
+            self.on_cancel()
+        else:
+            super(SplashScreen, self).reject()
+
     @QtCore.pyqtSlot(int)
     def stop(self, rdata):
 
+        if self.cancel and self.cancel.is_set():
+            QtWidgets.QMessageBox.information(self, "Cancelled",
+                                              f"Installation of {self.element} cancelled")
+            self.parent.update(2)
+            self.hide()
+            return
+
         QtWidgets.QMessageBox.information(
             self, "Success",
             f"{'Uninstalled ' + self.element if rdata else installer.INSTALLED_ELEMS}"
         )
-        self.__spinner.stop()
         self.adjustSize()
         self.parent.update(rdata)
         self.hide()
@@ -135,39 +244,232 @@ class SSTElementWindow(QtWidgets.QMainWindow):
         self.close()
 
 
+class ElementsModel(QtCore.QAbstractListModel):
+    """List of elements along with the elements registered on the system
+
+    New lists are applied as row-level diffs, so the view only updates the rows of the elements
+    added, removed or whose registration changed.
+    """
+
+    def __init__(self, highlight_registered=False):
+
+        super(ElementsModel, self).__init__()
+        self.elements = []
+        self.registered = set()
+        self.icon = QtGui.QIcon()
+        self.highlight_registered = highlight_registered
+        self.__rows = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        return 0 if parent.isValid() else len(self.elements)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        if not index.isValid():
+            return None
+
+        element = self.elements[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return element
+        if role == QtCore.Qt.DecorationRole:
+            return self.icon
+        if role == QtCore.Qt.BackgroundRole:
+            if self.highlight_registered and element in self.registered:
+                return QtGui.QBrush(QtGui.QColor("#2ecc71"))
+        return None
+
+    def set_icon(self, icon):
+
+        self.icon = icon
+        if self.elements:
+            self.dataChanged.emit(self.index(0), self.index(len(self.elements) - 1),
+                                  [QtCore.Qt.DecorationRole])
+
+    def set_elements(self, elements, registered):
+
+        elements = list(elements)
+        registered = set(registered)
+        new_elements = set(elements)
+        old_elements = set(self.__rows)
+
+        # elements listed in a different order cannot be diffed row by row
+        if ([element for element in self.elements if element in new_elements]
+                != [element for element in elements if element in old_elements]):
+            self.beginResetModel()
+            self.elements = elements
+            self.registered = registered
+            self.__rows = {element: row for row, element in enumerate(elements)}
+            self.endResetModel()
+            return
+
+        if new_elements != old_elements:
+
+            # remove the runs of rows of the elements no longer listed, starting from the bottom
+            row = len(self.elements)
+            while row:
+                row -= 1
+                if self.elements[row] not in new_elements:
+                    end = row
+                    while row and self.elements[row - 1] not in new_elements:
+                        row -= 1
+                    self.beginRemoveRows(QtCore.QModelIndex(), row, end)
+                    del self.elements[row:end + 1]
+                    self.endRemoveRows()
+
+            # insert the runs of rows of the new elements, before which both lists are identical
+            row = 0
+            while row < len(elements):
+                if elements[row] in old_elements:
+                    row += 1
+                    continue
+                end = row
+                while end + 1 < len(elements) and elements[end + 1] not in old_elements:
+                    end += 1
+                self.beginInsertRows(QtCore.QModelIndex(), row, end)
+                self.elements[row:row] = elements[row:end + 1]
+                self.endInsertRows()
+                row = end + 1
+
+            self.__rows = {element: row for row, element in enumerate(self.elements)}
+
+        changed = (self.registered ^ registered) & new_elements
+        self.registered = registered
+        for element in changed:
+            index = self.index(self.__rows[element])
+            self.dataChanged.emit(index, index, [QtCore.Qt.BackgroundRole])
+
+
 class ElementsListWindow(SSTElementWindow):
 
-    def __init__(self, parent, header):
+    def __init__(self, parent, header, highlight_registered=False):
 
         super(ElementsListWindow, self).__init__(parent)
 
         self.add_header()
         self.set_header(header)
 
-        self.list_view = QtWidgets.QListWidget()
+        self.status_label = QtWidgets.QLabel()
+        self.status_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.insert_widget(self.status_label)
+
+        self.model = ElementsModel(highlight_registered)
+        self.model.set_icon(get_default_icon())
+        get_icon_cache().changed.connect(self.on_icon_changed)
+
+        self.list_view = QtWidgets.QListView()
         self.list_view.setViewMode(QtWidgets.QListView.IconMode)
         self.list_view.setIconSize(QtCore.QSize(500, 500))
+        self.list_view.setModel(self.model)
         self.insert_widget(self.list_view)
 
         self.add_back_btn()
         self.add_exit_btn()
         self.add_hlayout()
 
-        self.elements = None
         self.list_view.clicked.connect(self.on_list_view_clicked)
 
-        self.default_icon = get_default_icon()
-
         self.update()
 
+    @QtCore.pyqtSlot()
+    def on_icon_changed(self):
 
-def get_default_icon():
+        self.model.set_icon(get_default_icon())
+
+    def set_loading(self):
+
+        # the elements listed so far are kept until the new list arrives
+        if not self.model.rowCount():
+            self.status_label.setText("Loading...")
+            self.status_label.show()
+
+    def set_elements(self, elements, registered):
+
+        self.status_label.hide()
+        self.model.set_elements(elements, registered)
+
+    @QtCore.pyqtSlot(object)
+    def on_query_failed(self, exc):
+
+        self.status_label.setText(f"Failed to load elements: {exc}")
+        self.status_label.show()
+
+
+class IconCache(QtCore.QObject):
+    """Icon of the elements shared by every window
+
+    The icon is loaded once per process from the on-disk cache. Until an icon is available, a
+    standard icon of the style is used while the icon is downloaded in the background, after which
+    `changed` is emitted.
+    """
+
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self):
+
+        super(IconCache, self).__init__()
+        self.icon = None
+
+    def get(self):
+
+        if self.icon is None:
+            path = get_icon_cache_path()
+            if path and path.is_file():
+                icon = QtGui.QIcon(str(path))
+                if not icon.isNull():
+                    self.icon = icon
+                    return self.icon
+
+            self.icon = QtWidgets.QApplication.style().standardIcon(
+                QtWidgets.QStyle.SP_ComputerIcon
+            )
+            run_query(download_icon, self.on_icon_downloaded)
 
-    img_url = "http://sst-simulator.org/img/sst-logo-small.png"
-    img_data = urllib.request.urlopen(urllib.request.Request(img_url)).read()
-    pixmap = QtGui.QPixmap()
-    pixmap.loadFromData(img_data)
-    icon = QtGui.QIcon()
-    icon.addPixmap(pixmap, QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        return self.icon
+
+    @QtCore.pyqtSlot(object)
+    def on_icon_downloaded(self, img_data):
+
+        pixmap = QtGui.QPixmap()
+        if pixmap.loadFromData(img_data):
+            self.icon = QtGui.QIcon()
+            self.icon.addPixmap(pixmap, QtGui.QIcon.Normal, QtGui.QIcon.Off)
+            self.changed.emit()
+
+
+def get_icon_cache_path():
+
+    if not installer.ELEMENT_SRC_DIR:
+        return None
+    return pathlib.Path(installer.ELEMENT_SRC_DIR) / installer.CACHE_DIR / ICON_FILE
+
+
+def download_icon():
+
+    with urllib.request.urlopen(urllib.request.Request(ICON_URL)) as img_file:
+        img_data = img_file.read()
+
+    cache_path = get_icon_cache_path()
+    if cache_path:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}")
+        tmp_path.write_bytes(img_data)
+        os.replace(tmp_path, cache_path)
+
+    return img_data
+
+
+__icon_cache = None
+
+
+def get_icon_cache():
+
+    global __icon_cache
+    if __icon_cache is None:
+        __icon_cache = IconCache()
+    return __icon_cache
+
+
+def get_default_icon():
 
-    return icon
+    return get_icon_cache().get()
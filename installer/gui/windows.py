@@ -1,14 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5 import QtCore, QtWidgets
 
+import daemon
 import installer
 import os
-from .templates import SSTElementWindow, SplashScreen, ElementsListWindow
+import threading
+from .templates import SSTElementWindow, SplashScreen, ElementsListWindow, run_query
 
 # suppress all console outputs
 installer.LOG = False
+# requests are sent to the installer daemon if it is running
+backend = daemon.Client()
 
 
 class CustomSpinBox(QtWidgets.QSpinBox):
@@ -18,6 +22,12 @@ class CustomSpinBox(QtWidgets.QSpinBox):
     def textFromValue(self, value):
         return "Max" if value == self.maximum() else str(value)
 
+
+def list_elements():
+
+    return list(backend.list_all_elements().keys()), set(backend.list_registered_elements())
+
+
 class ElementOptionsWindow(SSTElementWindow):
 
     def __init__(self, parent):
@@ -57,9 +67,25 @@ class ElementOptionsWindow(SSTElementWindow):
     def set_element(self, element):
 
         self.element = element
-        readme, url = installer.get_info(self.element)
-        self.url.setText(f"<a href='{url}'>{url}</a>")
-        self.about.setText(readme)
+        self.url.setText("")
+        self.about.setText("Loading README...")
+        run_query(lambda: (element, backend.get_info(element)),
+                  self.on_info_loaded, lambda exc: self.on_info_failed(element, exc))
+
+    @QtCore.pyqtSlot(object)
+    def on_info_loaded(self, info):
+
+        element, (readme, url) = info
+        # a README requested for a previously selected element is discarded
+        if element == self.element:
+            self.url.setText(f"<a href='{url}'>{url}</a>")
+            self.about.setText(readme)
+
+    def on_info_failed(self, element, exc):
+
+        # an error raised for a previously selected element is discarded as well
+        if element == self.element:
+            self.about.setText(str(exc))
 
     def set_registered(self, registered):
 
@@ -78,7 +104,7 @@ class ElementOptionsWindow(SSTElementWindow):
                 # uninstall button
                 self.uninstall_btn = QtWidgets.QPushButton("Uninstall")
                 self.uninstall_btn.clicked.connect(
-                    lambda: self.element_action(installer.uninstall))
+                    lambda: self.element_action(backend.uninstall))
                 self.insert_widget(self.uninstall_btn, 4)
                 self.uninstall_btn.setStyleSheet("background-color: #e74c3c")
 
@@ -137,8 +163,8 @@ class ElementOptionsWindow(SSTElementWindow):
                 # install button
                 self.install_btn = QtWidgets.QPushButton("Install")
                 self.install_btn.clicked.connect(
-                    lambda: self.element_action(installer.install, generator=self.gen_chosen,
-                                                n_jobs=self.jobs))
+                    lambda: self.element_action(backend.install, generator=self.gen_chosen,
+                                                n_jobs=self.jobs, cancel=threading.Event()))
                 self.insert_widget(self.install_btn, 5)
                 self.install_btn.setStyleSheet("background-color: #27ae60")
 
@@ -218,48 +244,47 @@ class RegisteredElementsWindow(ElementsListWindow):
     def on_list_view_clicked(self, index):
 
         self.hide()
-        self.selected_element_window.set_element(self.elements[index.row()])
+        self.selected_element_window.set_element(self.model.elements[index.row()])
         self.selected_element_window.set_registered(True)
         self.selected_element_window.show()
 
     def update(self):
 
-        self.list_view.clear()
-        self.elements = installer.list_registered_elements()
-        for element in self.elements:
-            element_item = QtWidgets.QListWidgetItem(element)
-            element_item.setSelected(False)
-            element_item.setIcon(self.default_icon)
-            self.list_view.addItem(element_item)
+        self.set_loading()
+        run_query(backend.list_registered_elements, self.on_elements_loaded, self.on_query_failed)
+
+    @QtCore.pyqtSlot(object)
+    def on_elements_loaded(self, elements):
+
+        self.set_elements(elements, elements)
 
 
 class ElementsWindow(ElementsListWindow):
 
     def __init__(self, parent):
 
-        super(ElementsWindow, self).__init__(parent, header="SST Elements")
+        super(ElementsWindow, self).__init__(parent, header="SST Elements",
+                                             highlight_registered=True)
         self.selected_element_window = ElementOptionsWindow(self)
 
     @QtCore.pyqtSlot("QModelIndex")
     def on_list_view_clicked(self, index):
 
-        element = self.elements[index.row()]
+        element = self.model.elements[index.row()]
         self.hide()
         self.selected_element_window.set_element(element)
-        self.selected_element_window.set_registered(installer.is_registered(element))
+        self.selected_element_window.set_registered(element in self.model.registered)
         self.selected_element_window.show()
 
     def update(self):
 
-        self.list_view.clear()
-        self.elements = list(installer.list_all_elements().keys())
-        for element in self.elements:
-            element_item = QtWidgets.QListWidgetItem(element)
-            if installer.is_registered(element):
-                element_item.setBackground(QtGui.QColor("#2ecc71"))
-            element_item.setSelected(False)
-            element_item.setIcon(self.default_icon)
-            self.list_view.addItem(element_item)
+        self.set_loading()
+        run_query(list_elements, self.on_elements_loaded, self.on_query_failed)
+
+    @QtCore.pyqtSlot(object)
+    def on_elements_loaded(self, elements):
+
+        self.set_elements(*elements)
 
 
 class MainWindow(SSTElementWindow):
@@ -270,13 +295,10 @@ class MainWindow(SSTElementWindow):
 
         self.intro = QtWidgets.QTextEdit()
         self.intro.setReadOnly(True)
-        self.intro.setText(f"""
-            <h1>SST Elements</h1>
-            <p style='font-size:12px;text-align:center'>{installer.get_version()}</p>
-        """)
-        self.intro.setAlignment(QtCore.Qt.AlignCenter)
+        self.set_version("Loading version...")
         self.intro.setStyleSheet("padding-top: 175")
         self.insert_widget(self.intro)
+        run_query(backend.get_version, self.set_version)
 
         reg_elems_btn = QtWidgets.QPushButton("Registered elements")
         self.insert_widget(reg_elems_btn)
@@ -293,6 +315,15 @@ class MainWindow(SSTElementWindow):
         self.elements_window = ElementsWindow(self)
         self.registered_elements_window = RegisteredElementsWindow(self)
 
+    @QtCore.pyqtSlot(object)
+    def set_version(self, version):
+
+        self.intro.setText(f"""
+            <h1>SST Elements</h1>
+            <p style='font-size:12px;text-align:center'>{version}</p>
+        """)
+        self.intro.setAlignment(QtCore.Qt.AlignCenter)
+
     def on_list_elems_clicked(self):
 
         self.hide()
@@ -3,7 +3,7 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-import sstelements
+import installer as sstelements
 from .templates import SSTElementWindow, SplashScreen, ElementsListWindow
 
 # suppress all console outputs
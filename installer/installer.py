@@ -15,29 +15,113 @@ The functionalities include:
     - uninstalling elements from the system
     - uninstalling dependent elements from the system
     - gathering version of SST Core installed in the system
+    - updating the local mirrors of the repositories of elements
 """
+import concurrent.futures
+import configparser
+import contextlib
+import fcntl
+import functools
+import hashlib
 import json
 import os
 import pathlib
 import re
+import shlex
 import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 import urllib.error
 import urllib.request
 
+import artifacts
+import buildlog
+import progress
+import resolver
+import scheduler
+import timing
+
 REG_ELEM_RE = re.compile(r"(((?<=^\d\.\s)|(?<=^\d{2}\.\s))\w*(?=.*?(?=VALID$)))", re.MULTILINE)
 
 ELEMENT_LIST_URL = os.environ.get("ELEMENT_LIST_URL", None)
 ELEMENT_SRC_DIR = os.environ.get("ELEMENT_SRC_DIR", None)
 
-if not (ELEMENT_LIST_URL and ELEMENT_SRC_DIR):
-    raise KeyError("Environment variables not set up properly")
+# directory of cached metadata such as the element list, relative to ELEMENT_SRC_DIR
+CACHE_DIR = pathlib.Path(".cache")
+# bare mirrors of the element repositories reused by subsequent clones, relative to ELEMENT_SRC_DIR
+MIRROR_DIR = pathlib.Path(".mirrors")
+# directories of uninstalled elements waiting to be deleted in the background, relative to
+# ELEMENT_SRC_DIR
+TRASH_DIR = pathlib.Path(".trash")
+# cache of built elements, which may be shared by multiple systems
+ARTIFACT_DIR = os.environ.get("ELEMENT_ARTIFACT_DIR", None)
+# user configuration file of SST where `sst-register` records the registered elements
+SST_CONFIG_FILE = pathlib.Path(
+    os.environ.get("SST_CONFIG_FILE", pathlib.Path.home() / ".sst" / "sstsimulator.conf")
+)
+# additional arguments to git for each clone strategy
+CLONE_MODES = {
+    "full": "",
+    "shallow": "--depth 1",
+    "partial": "--filter=blob:none",
+}
+# environment variables setting the directory and the size limit of each compiler cache
+COMPILER_CACHES = {
+    "ccache": ("CCACHE_DIR", "CCACHE_MAXSIZE"),
+    "sccache": ("SCCACHE_DIR", "SCCACHE_CACHE_SIZE"),
+}
+# maximum number of repositories cloned concurrently
+CLONE_WORKERS = int(os.environ.get("ELEMENT_CLONE_WORKERS", 4))
+# maximum number of READMEs fetched concurrently
+FETCH_WORKERS = int(os.environ.get("ELEMENT_FETCH_WORKERS", 8))
+# file names of READMEs in order of preference
+README_FILES = ("README.md", "README")
+# MiB of memory required by every compile job when the number of jobs is sized automatically
+JOB_MEMORY = int(os.environ.get("ELEMENT_JOB_MEMORY", 2048))
+# number of seconds a cached copy of the element list is used before it is revalidated
+CACHE_TTL = int(os.environ.get("ELEMENT_CACHE_TTL", 3600))
+# wrapper of `sst-register` put on the PATH of the builds. `sst-register` rewrites the whole SST
+# configuration file, so the registrations of concurrent builds are serialized by a lock.
+REGISTER_WRAPPER = """#!{python}
+import fcntl
+import subprocess
+import sys
 
-os.chdir(ELEMENT_SRC_DIR)
+try:
+    lock_file = open({lock!r}, "w")
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+except OSError:
+    pass
+sys.exit(subprocess.call([{register!r}] + sys.argv[1:]))
+"""
 
 INSTALLED_ELEMS = ""
 
 LOG = True
+# stream the log is printed to unless redirected by `redirect_log`. Defaults to the standard output.
+LOG_FILE = None
+CACHE = True
+
+# element list memoized for the lifetime of the process
+__ALL_ELEMENTS = None
+# registered elements along with the state of the configuration file they were read from
+__REGISTRY = None
+# dependency graph along with the list of elements it was built from
+__GRAPH = None
+# serializes messages logged by concurrent clones and builds
+__LOG_LOCK = threading.Lock()
+# if the environment has been checked and the working directory moved to ELEMENT_SRC_DIR
+__CONFIGURED = False
+# context of the operation run by each thread: the stream the log is redirected to, the tracer
+# recording the phases of the running installation or uninstallation and the callback receiving its
+# progress events. Threads started by an operation run in its context, see `__in_context`.
+__CONTEXT = threading.local()
+# READMEs of elements fetched from their repositories along with the time they were fetched at,
+# memoized for `CACHE_TTL` seconds or until the element list is refreshed
+__READMES = {}
 
 
 def __log(level="", message="", **kwargs):
@@ -46,12 +130,318 @@ def __log(level="", message="", **kwargs):
     Parameters:
     -----------
     level : str (default: "")
-        logging info level. Levels used are: INSTALL, REQUEST, DEPEND, REMOVE
+        logging info level. Levels used are: INSTALL, REQUEST, DEPEND, REMOVE, LOG, TIMING
     message : str (default: "")
         message to print
     """
     if LOG:
-        print(f"[{level}] {message}", **kwargs)
+        with __LOG_LOCK:
+            # a progress bar drawn on the terminal is redrawn by the next progress event
+            progress_callback = getattr(__CONTEXT, "progress", None)
+            if hasattr(progress_callback, "clear"):
+                progress_callback.clear()
+            print(f"[{level}] {message}", file=getattr(__CONTEXT, "log_file", None) or LOG_FILE,
+                  **kwargs)
+
+
+@contextlib.contextmanager
+def redirect_log(stream):
+    """Print the log of the operations run by the calling thread to a stream
+
+    The threads started by these operations, e.g. to clone and build elements, log to the stream as
+    well, while the other threads keep logging to `LOG_FILE`.
+
+    Parameters:
+    -----------
+    stream : file-like object
+        stream the log is printed to
+    """
+    log_file = getattr(__CONTEXT, "log_file", None)
+    __CONTEXT.log_file = stream
+    try:
+        yield stream
+    finally:
+        __CONTEXT.log_file = log_file
+
+
+def __in_context(func):
+    """Bind a function to the context of the operation run by the calling thread
+
+    Parameters:
+    -----------
+    func : callable
+        function to run from another thread
+
+    Returns:
+    --------
+    callable
+        function running `func` with the log stream, tracer and progress callback of the caller
+    """
+    context = dict(vars(__CONTEXT))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = dict(vars(__CONTEXT))
+        vars(__CONTEXT).update(context)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            vars(__CONTEXT).clear()
+            vars(__CONTEXT).update(previous)
+
+    return wrapper
+
+
+def __log_tail(element_log):
+    """Print the last lines logged by the current phase of an element
+
+    Parameters:
+    -----------
+    element_log : buildlog.ElementLog
+        logs of the element
+    """
+    tail = element_log.get_tail()
+    if tail:
+        __log("LOG", f"Last lines of {element_log.phase_path(element_log.phase)}:\n"
+                     + "\n".join(f"    {line}" for line in tail))
+
+
+def __emit(element, phase, current=None, total=None, message=""):
+    """Send a progress event to the callback of the running installation or uninstallation
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    phase : str
+        phase of the installation of the element
+    current : int (default: None)
+        amount of work done in the phase
+    total : int (default: None)
+        total amount of work of the phase
+    message : str (default: "")
+        description of the event
+    """
+    progress_callback = getattr(__CONTEXT, "progress", None)
+    if progress_callback:
+        progress_callback(progress.ProgressEvent(element, phase, current, total, message))
+
+
+def __line_listener(follow=False):
+    """Create the listener of the lines logged by elements as they are produced
+
+    Parameters:
+    -----------
+    follow : bool (default: False)
+        flag to print every line
+
+    Returns:
+    --------
+    callable(str, str, str) or None
+        function called with the element, the phase and every logged line, or None if the lines
+        are not needed
+    """
+    progress_callback = getattr(__CONTEXT, "progress", None)
+    if not (follow or progress_callback):
+        return None
+
+    def listener(element, phase, line):
+        if follow:
+            __log(f"{element}:{phase}", line)
+        if progress_callback:
+            event = progress.parse(element, phase, line)
+            if event:
+                progress_callback(event)
+
+    # the lines are read by the threads of the logs
+    return __in_context(listener)
+
+
+def __traced(summary=False):
+    """Record the phases run by a function in a tracer and report their progress
+
+    The decorated function accepts an additional `trace` keyword argument, the path of a file to
+    export the spans as Chrome trace events to, and an additional `progress` keyword argument, a
+    callback receiving `progress.ProgressEvent` instances from any thread. Calls nested in a traced
+    function are recorded in the tracer of the outermost call, while calls from unrelated threads
+    are traced apart.
+
+    Parameters:
+    -----------
+    summary : bool (default: False)
+        flag to print a table summarizing the time spent in every phase once the function returns
+    """
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, trace=None, progress=None, **kwargs):
+            if getattr(__CONTEXT, "tracer", None):
+                return func(*args, **kwargs)
+
+            tracer = __CONTEXT.tracer = timing.Tracer()
+            __CONTEXT.progress = progress
+            try:
+                return func(*args, **kwargs)
+            finally:
+                __CONTEXT.tracer = __CONTEXT.progress = None
+                if summary and tracer.events:
+                    __log("TIMING", f"Time spent in each phase (s):\n{tracer.summary()}")
+                if trace:
+                    tracer.write(trace)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def __span(phase, element, element_log=None):
+    """Record the span of a phase of an element in the running tracer
+
+    The start and the end of the phase are also reported as progress events.
+
+    Parameters:
+    -----------
+    phase : str
+        name of phase
+    element : str
+        name of element
+    element_log : buildlog.ElementLog (default: None)
+        logs of the element, through which the CPU time of the commands of the phase is measured
+
+    Yields:
+    -------
+    dict
+        record of the span, to which the CPU time of child processes is added
+    """
+    tracer = getattr(__CONTEXT, "tracer", None)
+    if not tracer:
+        yield {"child_cpu": 0.0}
+        return
+
+    __emit(element, phase, message="started")
+    cpu_time = element_log.cpu_time[phase] if element_log else 0.0
+    with tracer.span(phase, element) as record:
+        try:
+            yield record
+        finally:
+            if element_log:
+                record["child_cpu"] += element_log.cpu_time[phase] - cpu_time
+            __emit(element, phase, message="finished")
+
+
+def __transfer_flag():
+    """Choose the flag controlling the output of git transfers
+
+    Returns:
+    --------
+    str
+        "--progress" if progress is reported, "-q" otherwise
+    """
+    return "--progress" if getattr(__CONTEXT, "progress", None) else "-q"
+
+
+def __configure():
+    """Check the environment and move to the directory of element sources
+
+    This is deferred until an operation requires it, so that importing the module has no side
+    effects.
+
+    Raises:
+    -------
+    KeyError
+        environment variables are not set
+    """
+    global __CONFIGURED
+    if not __CONFIGURED:
+        if not (ELEMENT_LIST_URL and ELEMENT_SRC_DIR):
+            raise KeyError("Environment variables not set up properly")
+
+        os.chdir(ELEMENT_SRC_DIR)
+        __CONFIGURED = True
+
+
+def __fetch(url, cache_file, refresh=False):
+    """Fetch the contents of a URL through an on-disk cache
+
+    A cached copy younger than `CACHE_TTL` seconds is returned as is. Older copies are revalidated
+    with the ETag and Last-Modified headers received along with them, so an unchanged resource is
+    not downloaded again. The cached copy is also used if the server cannot be reached.
+
+    Parameters:
+    -----------
+    url : str
+        URL of the resource
+    cache_file : pathlib.Path
+        path to the cached copy of the resource
+    refresh : bool (default: False)
+        flag to revalidate the cached copy regardless of its age
+
+    Raises:
+    -------
+    urllib.error.HTTPError
+        resource cannot be fetched
+    urllib.error.URLError
+        server cannot be reached and no cached copy exists
+
+    Returns:
+    --------
+    str
+        contents of the resource
+    """
+    cached = None
+    try:
+        with cache_file.open() as cache:
+            cached = json.load(cache)
+    except (OSError, ValueError):
+        pass
+
+    if cached and cached.get("url") != url:
+        cached = None
+
+    if cached and not refresh and time.time() - cached["fetched"] < CACHE_TTL:
+        return cached["body"]
+
+    request = urllib.request.Request(url)
+    if cached:
+        if cached.get("etag"):
+            request.add_header("If-None-Match", cached["etag"])
+        if cached.get("last_modified"):
+            request.add_header("If-Modified-Since", cached["last_modified"])
+
+    try:
+        response = urllib.request.urlopen(request)
+
+    except urllib.error.HTTPError as exc:
+        # the cached copy is still valid
+        if not (cached and exc.code == 304):
+            raise
+        cached["fetched"] = time.time()
+
+    except urllib.error.URLError:
+        if not cached:
+            raise
+        __log("REQUEST", f"{url} cannot be reached. Using cached copy...")
+        return cached["body"]
+
+    else:
+        with response:
+            cached = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched": time.time(),
+                "body": response.read().decode("utf-8"),
+            }
+
+    # write to a temporary file first so that concurrent readers never see a partial cache
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}")
+    with tmp_file.open("w") as cache:
+        json.dump(cached, cache)
+    os.replace(tmp_file, cache_file)
+
+    return cached["body"]
 
 
 def get_version():
@@ -65,23 +455,109 @@ def get_version():
     return subprocess.check_output("$(which sst) -V || true", shell=True).decode("utf-8")
 
 
-def __clone(element, force, branch="master", commit="",
-            element_stdout=subprocess.DEVNULL, element_stderr=subprocess.DEVNULL):
+def __update_mirror(element, url, element_log, branch=None):
+    """Create or update the bare mirror of the repository of element
+
+    The mirror only holds the branches requested by installations. It is created empty, and every
+    branch is fetched alone the first time it is requested, like a single-branch clone, and
+    incrementally afterwards, so only objects new to the mirror are downloaded. If the server
+    cannot be reached, the mirror is used as is.
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    url : str
+        URL of the repository of the element
+    element_log : buildlog.ElementLog
+        logs of the element
+    branch : str (default: None)
+        branch to fetch into the mirror. Defaults to every branch already mirrored.
+
+    Raises:
+    -------
+    urllib.error.URLError
+        mirroring of element's repository failed
+
+    Returns:
+    --------
+    pathlib.Path
+        path to the mirror
+    """
+    mirror_path = MIRROR_DIR / f"{element}.git"
+    MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+    git = f"git --git-dir={shlex.quote(str(mirror_path))}"
+
+    # prevent other installers from updating the mirror at the same time
+    with (MIRROR_DIR / f"{element}.lock").open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        created = not mirror_path.is_dir()
+        if created:
+            __log("REQUEST", f"Mirroring {element}...")
+            # commits pinned by their SHA can be fetched from the mirror
+            if element_log.run("clone", f"git init -q --bare {shlex.quote(str(mirror_path))} && "
+                                        f"{git} config remote.origin.url {shlex.quote(url)} && "
+                                        f"{git} config uploadpack.allowAnySHA1InWant true"):
+                shutil.rmtree(mirror_path, ignore_errors=True)
+                raise urllib.error.URLError(f"Mirroring of repository for {element} failed")
+        else:
+            __log("REQUEST", f"Updating mirror of {element}...")
+
+        refspec = ""
+        if branch:
+            refspec = f"+refs/heads/{branch}:refs/heads/{branch}"
+            # the branch is updated along with the other mirrored branches from now on
+            refspecs = subprocess.run(f"{git} config --get-all remote.origin.fetch", shell=True,
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                      text=True).stdout.split()
+            if refspec not in refspecs:
+                element_log.run("clone",
+                                f"{git} config --add remote.origin.fetch {shlex.quote(refspec)}")
+            refspec = shlex.quote(refspec)
+
+        if element_log.run("clone", f"{git} fetch {__transfer_flag()} --prune origin {refspec}"):
+            if created:
+                shutil.rmtree(mirror_path, ignore_errors=True)
+                raise urllib.error.URLError(f"Mirroring of repository for {element} failed")
+            __log("REQUEST", f"Mirror of {element} cannot be updated. Using mirror as is...")
+
+    return mirror_path
+
+
+def __clone(element, branch="master", commit="", clone_mode="full", mirror=True, update=False,
+            element_log=None):
     """Clone repository of element if it is deemed official and trusted
 
     If element is found on `_list_all_elements()`, it will be cloned from its repository with the
-    URL provided
+    URL provided. Since clones run concurrently, the working directory of the process is left
+    untouched.
+
+    With `mirror` set, full clones are cloned from a local bare mirror which is first brought up to
+    date, so reinstalling an element only downloads the objects added since the last install.
+    Shallow and partial clones are cloned from the repository of the element, since filling the
+    mirror would download the history and the files they skip.
+
+    Shallow and partial clones of a pinned commit fetch the commit directly, which skips the history
+    of the branch. If the server refuses to serve the commit, the branch is cloned and reverted to
+    the commit instead.
 
     Parameters:
     -----------
     element : str
         name of element
-    force : bool
-        flag to force install. If true and element is already installed, the element is re-cloned
     branch : str (default: "master")
         branch of repository of the element
     commit : str (default: "")
         commit SHA to revert to in the repository of the element
+    clone_mode : str (default: "full")
+        clone strategy. Supported strategies are "full", "shallow" and "partial".
+    mirror : bool (default: True)
+        flag to clone from the local mirror of the repository
+    update : bool (default: False)
+        flag to update an existing clone in place instead of cloning the repository again
+    element_log : buildlog.ElementLog (default: None)
+        logs of the element. Defaults to new logs under `buildlog.LOG_DIR`.
 
     Raises:
     -------
@@ -89,39 +565,338 @@ def __clone(element, force, branch="master", commit="",
         cloning of element's repository failed
     FileNotFoundError
         requested element does not exist
+    """
+    all_elements = list_all_elements()
+    if element not in all_elements.keys():
+        raise FileNotFoundError(f"{element} not found")
+
+    url = all_elements[element]["url"]
+    element_path = pathlib.Path(ELEMENT_SRC_DIR) / element
+    element_log = element_log or buildlog.ElementLog(element)
+    if mirror and clone_mode == "full":
+        source = __update_mirror(element, url, element_log, branch).absolute().as_uri()
+    else:
+        source = url
+    # the values interpolated in the commands may come from other users through the daemon
+    quoted_url, source, branch, commit = (shlex.quote(value) if value else value
+                                          for value in (url, source, branch, commit))
+
+    def git(cmd, cwd=element_path):
+        return element_log.run("clone", f"git {cmd}", cwd=cwd)
+
+    transfer = __transfer_flag()
+
+    # check out the new revision over the existing clone, which leaves the untracked build
+    # directory intact and the timestamps of unchanged files untouched
+    if update and (element_path / ".git").is_dir():
+        __log("REQUEST", f"Updating {element}...")
+        if commit and not re.fullmatch(r"[0-9a-f]{40}", commit):
+            # an abbreviated SHA has to be found in the history of the branch
+            updated = not (git(f"fetch {transfer} {source} {branch}")
+                           or git(f"checkout -q -f -B {branch} {commit}"))
+        else:
+            updated = not (git(f"fetch {transfer} {CLONE_MODES[clone_mode]} {source} "
+                               f"{commit or branch}")
+                           or git(f"checkout -q -f -B {branch} FETCH_HEAD"))
+        if not updated:
+            raise urllib.error.URLError(f"Updating of repository for {element} failed")
+        return
+
+    __log("REQUEST", f"Cloning {element}...")
+    # only full SHAs can be fetched directly
+    if commit and clone_mode != "full" and re.fullmatch(r"[0-9a-f]{40}", commit):
+        element_path.mkdir()
+        if not (git("init -q") or git(f"remote add origin {source}")
+                or git(f"fetch {transfer} {CLONE_MODES[clone_mode]} origin {commit}")
+                or git(f"checkout -q -B {branch} FETCH_HEAD")
+                or git(f"remote set-url origin {quoted_url}")):
+            return
+        shutil.rmtree(element_path)
+
+    # a shallow clone may not reach the pinned commit
+    clone_flags = "" if commit and clone_mode == "shallow" else CLONE_MODES[clone_mode]
+
+    # git clone failed if exit code is non-zero
+    if git(f"clone {transfer} {clone_flags} -b {branch} --single-branch {source} "
+           f"{shlex.quote(element)}",
+           cwd=ELEMENT_SRC_DIR):
+        raise urllib.error.URLError(f"Cloning of repository for {element} failed")
+
+    # point the clone to the upstream repository instead of the mirror
+    git(f"remote set-url origin {quoted_url}")
+
+    if commit:
+        git(f"reset --hard {commit}")
+
+
+def __clone_all(elements, revisions, element_logs, clone_mode="full", mirror=True, update=False):
+    """Clone repositories of elements concurrently
+
+    At most `CLONE_WORKERS` repositories are cloned at a time. A failed clone does not interrupt
+    the others, and every failure is reported before an exception is raised.
+
+    Parameters:
+    -----------
+    elements : list(str)
+        names of elements
+    revisions : dict(str, tuple(str, str))
+        branch and commit SHA of elements that are not to be cloned at the head of master
+    element_logs : dict(str, buildlog.ElementLog)
+        logs of each element
+    clone_mode : str (default: "full")
+        clone strategy. Supported strategies are "full", "shallow" and "partial".
+    mirror : bool (default: True)
+        flag to clone from the local mirrors of the repositories
+    update : bool (default: False)
+        flag to update existing clones in place
+
+    Raises:
+    -------
+    urllib.error.URLError
+        cloning of at least one of the repositories failed
+    """
+    def clone(_element):
+        with __span("clone", _element, element_logs[_element]):
+            __clone(_element, *revisions.get(_element, ("master", "")), clone_mode, mirror, update,
+                    element_logs[_element])
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CLONE_WORKERS,
+                                               thread_name_prefix="clone") as pool:
+        futures = {pool.submit(__in_context(clone), _element): _element for _element in elements}
+        for future in concurrent.futures.as_completed(futures):
+            element_log = element_logs[futures[future]]
+            try:
+                future.result()
+            except urllib.error.URLError as exc:
+                # clones interrupted by a cancellation are not reported
+                if not (element_log.cancel and element_log.cancel.is_set()):
+                    __log("REQUEST", exc.reason)
+                    __log_tail(element_log)
+                failed.append(futures[future])
+            except FileNotFoundError as exc:
+                __log("REQUEST", exc)
+                failed.append(futures[future])
+
+    if failed:
+        raise urllib.error.URLError(f"Cloning of repositories for {', '.join(failed)} failed")
+
+
+def update_mirrors():
+    """Bring the local mirrors of the repositories of elements up to date
+
+    Only the mirrors created by previous installations are updated, at most `CLONE_WORKERS` at a
+    time, so that the next installations only fetch the objects added in the meantime.
 
     Returns:
     --------
-    bool
-        if element was clone
+    list(str)
+        names of elements whose mirror was updated
     """
-    __log("REQUEST", f"Cloning {element}...")
-    if pathlib.Path(element).is_dir():
-        if not force:
-            __log("INSTALL", f"{element} already installed")
-            return False
-        else:
-            uninstall(element)
+    __configure()
+    all_elements = list_all_elements()
+    elements = sorted(path.name[:-len(".git")] for path in MIRROR_DIR.glob("*.git")
+                      if path.name[:-len(".git")] in all_elements)
+
+    # the logs of the updates are kept apart from the logs of installations, which may be kept for
+    # inspection after a failure
+    with tempfile.TemporaryDirectory(prefix="mirror-logs-") as log_dir:
+
+        def update(_element):
+            __update_mirror(_element, all_elements[_element]["url"],
+                            buildlog.ElementLog(_element, log_dir=log_dir))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CLONE_WORKERS) as pool:
+            list(pool.map(__in_context(update), elements))
+    return elements
+
+
+def __compiler_identity(env):
+    """Identify the C and C++ compilers used by CMake
+
+    Parameters:
+    -----------
+    env : dict(str, str)
+        environment the builds run in
+
+    Returns:
+    --------
+    list(str)
+        version strings of the C and C++ compilers
+    """
+    identity = []
+    for var, default in (("CC", "cc"), ("CXX", "c++")):
+        try:
+            identity.append(subprocess.check_output(
+                f"{env.get(var, default)} --version", shell=True, env=env, stderr=subprocess.DEVNULL
+            ).decode("utf-8").partition("\n")[0])
+        except subprocess.CalledProcessError:
+            identity.append("")
+    return identity
+
+
+def __artifact_keys(graph, elements, installing, revisions, generator, env):
+    """Derive the artifact keys of elements
+
+    The key of an element covers its commit, the build configuration, the compilers, the version of
+    SST, the source directory and the keys of its dependencies. Build trees hold the absolute paths
+    of their sources and dependencies, so artifacts are only shared by installers building in the
+    same `ELEMENT_SRC_DIR`. Installed elements are keyed by their checked out commit while the
+    commits of elements to be installed are resolved on their remote repositories.
+
+    Parameters:
+    -----------
+    graph : resolver.DependencyGraph
+        dependency graph of all elements
+    elements : list(str)
+        names of elements ordered such that every element succeeds its dependencies
+    installing : list(str)
+        names of elements to be installed
+    revisions : dict(str, tuple(str, str))
+        branch and commit SHA of elements that are not to be installed at the head of master
+    generator : str
+        build tool used to build the elements
+    env : dict(str, str)
+        environment the builds run in
 
+    Returns:
+    --------
+    dict(str, str)
+        artifact key of each element, or None if the commit of the element or one of its
+        dependencies cannot be resolved
+    """
     all_elements = list_all_elements()
-    if element in all_elements.keys():
-        # git clone failed if exit code is non-zero
-        if subprocess.call(
-            f"git clone -q -b {branch} --single-branch {all_elements[element]['url']}",
-            shell=True, stdout=element_stdout, stderr=element_stderr
-        ):
-            raise urllib.error.URLError(f"Cloning of repository for {element} failed")
 
-        else:
+    def resolve(_element):
+        try:
+            if _element not in installing:
+                return subprocess.check_output(
+                    "git rev-parse HEAD", shell=True, cwd=pathlib.Path(ELEMENT_SRC_DIR) / _element,
+                    stderr=subprocess.DEVNULL
+                ).decode("utf-8").strip()
+
+            branch, commit = revisions.get(_element, ("master", ""))
             if commit:
-                os.chdir(element)
-                subprocess.call(f"git reset --hard {commit}",
-                                shell=True, stdout=element_stdout, stderr=element_stderr)
-                os.chdir(ELEMENT_SRC_DIR)
-            return True
+                # abbreviated SHAs cannot be resolved without a clone
+                return commit if re.fullmatch(r"[0-9a-f]{40}", commit) else None
+
+            return subprocess.check_output(
+                f"git ls-remote {shlex.quote(all_elements[_element]['url'])} "
+                f"{shlex.quote('refs/heads/' + branch)}", shell=True,
+                stderr=subprocess.DEVNULL
+            ).decode("utf-8").split()[0]
+
+        except (subprocess.CalledProcessError, OSError, IndexError):
+            return None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CLONE_WORKERS) as pool:
+        commits = dict(zip(elements, pool.map(resolve, elements)))
+
+    build_config = {
+        "generator": generator,
+        "compiler": __compiler_identity(env),
+        "sst": get_version(),
+        "src_dir": str(pathlib.Path(ELEMENT_SRC_DIR).resolve()),
+        "flags": {var: env.get(var, "") for var in ("CPPFLAGS", "CFLAGS", "CXXFLAGS", "LDFLAGS")},
+    }
+
+    keys = {}
+    for _element in elements:
+        dep_keys = [keys[dep] for dep in graph.get_dependencies(_element)]
+        keys[_element] = artifacts.make_key(
+            element=_element, commit=commits[_element], dependencies=dep_keys, **build_config
+        ) if commits[_element] and all(dep_keys) else None
 
-    else:
-        raise FileNotFoundError(f"{element} not found")
+    return keys
+
+
+def __restore_artifact(element, artifact_cache, key):
+    """Unpack element from the artifact cache and register it
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    artifact_cache : str
+        directory of the artifact cache
+    key : str
+        artifact key of the element
+
+    Returns:
+    --------
+    bool
+        if element was restored
+    """
+    element_path = pathlib.Path(ELEMENT_SRC_DIR) / element
+    if not (pathlib.Path(artifact_cache) / f"{key}.tar.gz").is_file():
+        return False
+
+    if element_path.is_dir():
+        uninstall(element)
+
+    with __span("restore", element):
+        metadata = artifacts.fetch(artifact_cache, key, element_path)
+    if metadata is None:
+        return False
+
+    # replay the registration performed by the build of the element
+    with __span("register", element) as span, __registry_lock():
+        for section, option, value in metadata["registry"]:
+            span["child_cpu"] += timing.call(
+                f"sst-register {shlex.quote(section)} "
+                f"{shlex.quote(option + '=' + value.replace('{element_path}', str(element_path)))}",
+                stdout=subprocess.DEVNULL
+            )[1]
+    __invalidate_registry()
+    return True
+
+
+def __store_artifact(element, artifact_cache, key):
+    """Pack a built element into the artifact cache
+
+    Only elements whose registration can be read from the SST configuration file are stored, since
+    the registration has to be replayed when the element is restored.
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    artifact_cache : str
+        directory of the artifact cache
+    key : str
+        artifact key of the element
+    """
+    element_path = pathlib.Path(ELEMENT_SRC_DIR) / element
+    registry = [(section, option, value.replace(str(element_path), "{element_path}"))
+                for section, option, value in __registry_entries(element)]
+    if not registry:
+        __log("INSTALL", f"{element} is not registered. Skipping artifact cache...")
+        return
+
+    __log("INSTALL", f"Storing {element} in artifact cache...")
+    try:
+        artifacts.store(artifact_cache, key, element_path,
+                        {"element": element, "registry": registry})
+    except OSError as exc:
+        __log("INSTALL", f"Storing {element} in artifact cache failed: {exc}")
+
+
+def __dependency_graph():
+    """Get the dependency graph of the official list of elements
+
+    The graph is built once per list of elements and held in memory along with it, so it is only
+    built again when the list is fetched again.
+
+    Returns:
+    --------
+    resolver.DependencyGraph
+        dependency graph of all elements
+    """
+    global __GRAPH
+    all_elements = list_all_elements()
+    if __GRAPH is None or __GRAPH[0] is not all_elements:
+        __GRAPH = (all_elements, resolver.DependencyGraph(all_elements))
+    return __GRAPH[1]
 
 
 def get_dependencies(element):
@@ -142,38 +917,49 @@ def get_dependencies(element):
     list(str)
         dependencies of element
     """
-    all_elements = list_all_elements()
-    if element in all_elements.keys():
-        return all_elements[element]["dep"]
-
-    raise FileNotFoundError(f"{element} not found")
+    return __dependency_graph().get_dependencies(element)
 
 
-def __add_dependencies(old, new):
-    """Add new elements to list of dependencies
-
-    If the new list of dependencies include elements already in the original list of dependencies,
-    the index of the element is shifted to properly update the dependency graph
+def __compiler_cache_stats(compiler_cache, env):
+    """Gather the number of hits and misses recorded by a compiler cache
 
     Parameters:
     -----------
-    old : list(str)
-        original list of dependencies
-    new : list(str)
-        new list of elements to be added as dependencies
+    compiler_cache : str
+        name of compiler cache. Supported caches are "ccache" and "sccache".
+    env : dict(str, str)
+        environment the compiler cache runs in
 
     Returns:
     --------
-    list(str)
-        updated list of dependencies
+    tuple(int, int) or None
+        number of cache hits and misses, or None if the statistics cannot be gathered
     """
-    __log("DEPEND", "Updating dependency list...")
-    for _element in new:
-        if _element in old:
-            old.remove(_element)
-        old.append(_element)
+    try:
+        if compiler_cache == "ccache":
+            stats = dict(
+                line.split("\t", 1) for line in subprocess.check_output(
+                    "ccache --print-stats", shell=True, env=env, stderr=subprocess.DEVNULL
+                ).decode("utf-8").splitlines() if "\t" in line
+            )
+            # counters were renamed in ccache 4.0
+            return (
+                sum(int(stats.get(counter, 0)) for counter in (
+                    "direct_cache_hit", "preprocessed_cache_hit",
+                    "cache_hit_direct", "cache_hit_preprocessed"
+                )),
+                int(stats.get("cache_miss", 0))
+            )
+
+        stats = json.loads(subprocess.check_output(
+            "sccache --show-stats --stats-format=json", shell=True, env=env,
+            stderr=subprocess.DEVNULL
+        ).decode("utf-8"))["stats"]
+        return (sum(stats["cache_hits"]["counts"].values()),
+                sum(stats["cache_misses"]["counts"].values()))
 
-    return old
+    except (subprocess.CalledProcessError, ValueError, KeyError):
+        return None
 
 
 def __get_var_path(dep):
@@ -192,202 +978,613 @@ def __get_var_path(dep):
     pass
 
 
-def install(element, force=False, generator="makefile", n_jobs=0,
-            branch="master", commit="", suppress_dump=True):
-    """Install element as well as its dependencies
+@__traced(summary=True)
+def install(element="", force=False, generator="makefile", n_jobs=0,
+            branch="master", commit="", suppress_dump=True, clone_mode="full", mirror=True,
+            update=False, compiler_cache=None, compiler_cache_dir=None, compiler_cache_size=None,
+            artifact_cache=None, elements=None, follow=False, timeouts=None, cancel=None):
+    """Install elements as well as their dependencies
 
-    The element's repository is first cloned and its dependencies are determined. The dependency
-    elements are then cloned as well until no more dependencies are required. All the elements are
-    finally installed with their respective Makefiles in the reversed order of when they were added.
+    The complete dependency graph of the elements is first resolved from the list of elements. The
+    repositories of the elements and every dependency not yet installed are then cloned
+    concurrently. All the elements are finally installed with their respective Makefiles such that
+    every element is built after its dependencies, while elements independent of each other are
+    built concurrently. Dependencies shared by multiple elements are only cloned and built once.
+
+    A cancelled installation kills the commands running, skips the elements not built yet and rolls
+    them back, while the elements already installed and registered are kept. Elements that fail to
+    clone or build are rolled back as well, except for clones updated in place, so that they can be
+    installed again. Their logs are kept.
 
     Parameters:
     -----------
-    element : str
+    element : str (default: "")
         name of element
     force : bool (default: False)
         flag to force install. If true and element is already installed, the
         element is re-cloned
+    generator : str (default: "makefile")
+        build tool used to build the elements. Supported tools are "makefile" and "ninja".
+    n_jobs : int (default: 0)
+        total number of jobs shared by the concurrent builds. Defaults to the number of CPUs the
+        process is allowed to use, lowered so that every job gets `JOB_MEMORY` MiB of the memory
+        available, in which case no job is started while the load average exceeds the number of
+        CPUs of the system.
     branch : str (default: "master")
         branch of repository of the element
     commit : str (default: "")
-        commit SHA to revert to in the repository of the element
+        commit SHA to revert to in the repository of the element. A commit can only be pinned when a
+        single element is requested.
+    suppress_dump : bool (default: True)
+        flag to remove the logs of the elements installed successfully. The logs of every phase of
+        the installation of an element are written under `buildlog.LOG_DIR`, and the logs of failed
+        elements are always kept.
+    clone_mode : str (default: "full")
+        clone strategy. "full" clones the complete history of the branch, "shallow" clones only its
+        head or the pinned commit, and "partial" clones the complete history while downloading the
+        file contents on demand.
+    mirror : bool (default: True)
+        flag to keep bare mirrors of the repositories under `MIRROR_DIR` and clone from them, so
+        reinstalling an element only downloads the objects added since it was last installed. Only
+        full clones use the mirrors.
+    update : bool (default: False)
+        flag to update installed elements in place. The new revision is checked out over the
+        existing clone and the existing build directory is reused, so only the files that changed
+        are rebuilt.
+    compiler_cache : str (default: None)
+        compiler cache launching the compilers. Supported caches are "ccache" and "sccache".
+    compiler_cache_dir : str (default: None)
+        directory of the compiler cache. Defaults to the directory configured for the cache.
+    compiler_cache_size : str (default: None)
+        size limit of the compiler cache, e.g. "10G". Defaults to the limit configured for the
+        cache.
+    artifact_cache : str (default: None)
+        directory of the cache of built elements. Elements found in the cache are unpacked and
+        registered instead of being cloned and built. Defaults to `ARTIFACT_DIR`, and the cache is
+        disabled if neither is set.
+    elements : list(str) (default: None)
+        names of additional elements to install along with element
+    follow : bool (default: False)
+        flag to print the output of the clones and builds as it is produced
+    timeouts : dict(str, float) (default: None)
+        maximum number of seconds spent by an element in each phase, i.e. "clone", "configure" and
+        "build". An element running past the timeout of a phase fails.
+    cancel : threading.Event (default: None)
+        event set from any thread to cancel the installation
+    trace : str (default: None)
+        path of a file to export the time spent in every phase to, as Chrome trace events
+    progress : callable(progress.ProgressEvent) (default: None)
+        callback receiving the progress of the installation from the threads cloning and building
+        the elements. Events of the "install" phase without an element count the elements done out
+        of the elements to clone and build.
+
+    Raises:
+    -------
+    urllib.error.URLError
+        cloning of element's repository or one of its dependencies failed
+    FileNotFoundError
+        requested element or one of its dependencies does not exist
+    ValueError
+        branch or commit is not valid, or a commit is pinned for multiple elements
 
     Returns:
     --------
     int
         return code for the GUI wrapper. Return 0 on success, 2 on failure.
     """
-    install_vars = []
-    dependencies = []
-    if suppress_dump:
-        element_stdout = element_stderr = subprocess.DEVNULL
+    __configure()
+    # remove duplicates while preserving the order of the requested elements
+    roots = list(dict.fromkeys(([element] if element else []) + list(elements or [])))
+    if commit and len(roots) > 1:
+        raise ValueError("A commit can only be pinned for a single element")
+    # branches and commits are passed to git, which would take a leading dash for an option
+    if not branch or branch.startswith("-"):
+        raise ValueError(f"Invalid branch: {branch}")
+    if commit and not re.fullmatch(r"[0-9a-f]{4,40}", commit):
+        raise ValueError(f"Invalid commit SHA: {commit}")
+
+    for root in roots[:]:
+        if pathlib.Path(root).is_dir() and not (force or update):
+            __log("INSTALL", f"{root} already installed")
+            roots.remove(root)
+    if not roots:
+        return 2
+
+    # using Makefile
+    if generator == "makefile":
+        cmake_cmd = "cmake .."
+        tool, extra_jobs = "Makefile", 0
+
+    # using Ninja
+    elif generator == "ninja":
+        cmake_cmd = "cmake -GNinja .."
+        tool, extra_jobs = "Ninja", 2
+
     else:
-        element_stdout = open((pathlib.Path("element-logs") / (element + ".out")), "w+")
-        element_stderr = open((pathlib.Path("element-logs") / (element + ".err")), "w+")
-
-    # clone the targeted element repository
-    if __clone(element=element, force=force, branch=branch, commit=commit,
-               element_stdout=element_stdout, element_stderr=element_stderr):
-
-        # add its dependencies as well as its Makefile variable definitions
-        __log("DEPEND", f"Gathering dependencies for {element}...")
-        dependencies.extend(get_dependencies(element))
-        # install_vars.append((element, __get_var_path(dependencies)))
-        install_vars.append(element)
-
-        # if the element depends on any other elements
-        if dependencies:
-            __log("DEPEND", f"Found dependencies: {', '.join(dependencies)}")
-
-            # loop through its dependencies to generate a dependency graph
-            for dep in dependencies:
-
-                if __clone(element=dep, force=force, element_stdout=element_stdout,
-                           element_stderr=element_stderr):
-
-                    # update the list of elements to be installed along with their corresponding
-                    # Makefile variable definitions
-                    __log("DEPEND", f"Gathering dependencies for {dep}...")
-                    new_dependencies = get_dependencies(dep)
-                    dependencies = __add_dependencies(dependencies, new_dependencies)
-                    # install_vars.append((dep, __get_var_path(new_dependencies)))
-                    install_vars.append(dep)
-                    if new_dependencies:
-                        __log(
-                            "DEPEND",
-                            f"Found dependencies: {', '.join(new_dependencies)} (from {dep})"
-                        )
-                    else:
-                        __log("DEPEND", f"No dependencies found for {dep}")
-
-            # reverse the dependency graph represented in a flat array so that the parent
-            # elements are installed before their children
-            install_vars = install_vars[::-1]
-            __log("INSTALL", "Installing dependencies...")
-
-        # if the element does not depend on any other elements
-        else:
-            __log("DEPEND", "No dependencies found")
+        raise NotImplementedError(f"{generator} is not supported")
 
-        cmake_cmd = ""
-        gen_cmd = ""
+    # the budget of jobs is sized from the CPUs and memory the process is allowed to use
+    max_load = None
+    if n_jobs:
+        budget = n_jobs
+        __log("INSTALL", f"Using {tool} with {budget} job(s) to build...")
+    else:
+        budget, max_load, limits = scheduler.auto_jobs(JOB_MEMORY * 2 ** 20, extra_jobs)
+        __log("INSTALL", f"Using {tool} with {budget} job(s) to build ({limits})...")
+
+    if clone_mode not in CLONE_MODES:
+        raise NotImplementedError(f"{clone_mode} clones are not supported")
+
+    build_env = dict(os.environ)
+    # concurrent builds register their element one at a time
+    __wrap_register(build_env)
+    if compiler_cache:
+        if compiler_cache not in COMPILER_CACHES:
+            raise NotImplementedError(f"{compiler_cache} is not supported")
+        if not shutil.which(compiler_cache):
+            raise FileNotFoundError(f"{compiler_cache} not found")
+
+        __log("INSTALL", f"Using {compiler_cache} to compile...")
+        cmake_cmd = cmake_cmd.replace(
+            " ..", f" -DCMAKE_C_COMPILER_LAUNCHER={compiler_cache}"
+                   f" -DCMAKE_CXX_COMPILER_LAUNCHER={compiler_cache} .."
+        )
+        dir_var, size_var = COMPILER_CACHES[compiler_cache]
+        if compiler_cache_dir:
+            build_env[dir_var] = str(compiler_cache_dir)
+        if compiler_cache_size:
+            build_env[size_var] = str(compiler_cache_size)
+
+    # resolve the complete dependency graph before cloning any repository
+    __log("DEPEND", f"Gathering dependencies for {', '.join(roots)}...")
+    graph = __dependency_graph()
+    closure = graph.topological_order(graph.closure(roots))
+    install_vars = closure[:]
+    dependencies = [_element for _element in closure if _element not in roots]
+    if dependencies:
+        __log("DEPEND", f"Found dependencies: {', '.join(dependencies)}")
+    else:
+        __log("DEPEND", "No dependencies found")
 
-        # using Makefile
-        if generator == "makefile":
-            cmake_cmd = "cmake .."
-            if not n_jobs:
-                gen_cmd = "make -j"
-                __log("INSTALL", f"Using Makefile with ~{os.cpu_count()} job(s) to build...")
+    replaced = []
+    for _element in install_vars[:]:
+        if pathlib.Path(_element).is_dir():
+            # existing clones are updated in place
+            if update and (pathlib.Path(_element) / ".git").is_dir():
+                continue
+            if force or _element in roots:
+                replaced.append(_element)
             else:
-                gen_cmd = f"make -j {n_jobs}"
-                __log("INSTALL", f"Using Makefile with {n_jobs} job(s) to build...")
-
-        # using Ninja
-        elif generator == "ninja":
-            cmake_cmd = "cmake -GNinja .."
-            if not n_jobs:
-                gen_cmd = "ninja -j"
-                __log("INSTALL", f"Using Ninja with {os.cpu_count() + 2} job(s) to build...")
+                __log("INSTALL", f"{_element} already installed")
+                install_vars.remove(_element)
+    if replaced:
+        uninstall(elements=replaced)
+
+    revisions = {root: (branch, commit) for root in roots}
+    listener = __line_listener(follow)
+    element_logs = {
+        _element: buildlog.ElementLog(_element, follow=listener, timeouts=timeouts, cancel=cancel)
+        for _element in install_vars
+    }
+
+    def cancelled():
+        return bool(cancel and cancel.is_set())
+
+    artifact_cache = artifact_cache or ARTIFACT_DIR
+    restored = []
+    if artifact_cache:
+        __log("INSTALL", "Looking up built elements in artifact cache...")
+        keys = __artifact_keys(graph, closure, install_vars, revisions, generator, build_env)
+        for _element in install_vars[:]:
+            if keys[_element] and __restore_artifact(_element, artifact_cache, keys[_element]):
+                __log("INSTALL", f"Restored {_element} from artifact cache")
+                install_vars.remove(_element)
+                restored.append(_element)
+
+    # clones updated in place cannot be rolled back
+    existing = {_element for _element in install_vars if pathlib.Path(_element).is_dir()}
+    try:
+        __clone_all(install_vars, revisions, element_logs, clone_mode, mirror, update)
+    except urllib.error.URLError:
+        # the elements are rolled back once the builds are skipped
+        if not cancelled():
+            # the clones are not left behind to be taken for installed elements
+            __rollback([_element for _element in install_vars if _element not in existing])
+            raise
+
+    if any(_element not in roots for _element in install_vars):
+        __log("INSTALL", "Installing dependencies...")
+
+    done = []
+    done_lock = threading.Lock()
+
+    def build(_element, jobs, jobserver):
+        built = not cancelled() and build_element(_element, jobs, jobserver)
+        with done_lock:
+            done.append(_element)
+            __emit(None, "install", len(done), len(install_vars),
+                   f"{_element} {'installed' if built else 'failed'}")
+        return built
+
+    def build_element(_element, jobs, jobserver):
+        __log("INSTALL", f"Installing {_element}...")
+
+        build_path = pathlib.Path(ELEMENT_SRC_DIR) / _element / "build"
+        build_path.mkdir(parents=True, exist_ok=True)
+        element_log = element_logs[_element]
+
+        with __span("configure", _element, element_log):
+            returncode = element_log.run("configure", cmake_cmd, cwd=build_path, env=build_env)
+        if returncode:
+            if not cancelled():
+                __log("INSTALL", f"Configuring {_element} failed")
+                __log_tail(element_log)
+            return False
+
+        # Makefile builds draw their jobs from the jobserver shared by the concurrent builds
+        with __span("build", _element, element_log):
+            if jobserver:
+                returncode = element_log.run("build", "make", cwd=build_path,
+                                             env=jobserver.env(build_env), pass_fds=jobserver.fds)
             else:
-                gen_cmd = f"ninja -j {n_jobs}"
-                __log("INSTALL", f"Using Ninja with {n_jobs} job(s) to build...")
+                returncode = element_log.run(
+                    "build", f"ninja -j {jobs}" + (f" -l {max_load}" if max_load else ""),
+                    cwd=build_path, env=build_env
+                )
+
+        if returncode and not cancelled():
+            __log("INSTALL", f"Building {_element} failed")
+            __log_tail(element_log)
+        return not returncode
+
+    # the counters of the cache are shared by the concurrent builds, so they are only reported for
+    # the whole installation
+    stats = __compiler_cache_stats(compiler_cache, build_env) if compiler_cache else None
+    failed = scheduler.run_levels(
+        graph.levels(install_vars), __in_context(build), budget, graph.dependencies,
+        jobserver=generator == "makefile", cancel=cancel, max_load=max_load
+    )
+    new_stats = __compiler_cache_stats(compiler_cache, build_env) if stats else None
+    if new_stats:
+        __log("INSTALL", f"{compiler_cache} statistics: {new_stats[0] - stats[0]} hit(s), "
+                         f"{new_stats[1] - stats[1]} miss(es)")
+    # elements skipped after a dependency failed are done as well
+    if len(done) < len(install_vars):
+        __emit(None, "install", len(install_vars), len(install_vars), "skipped")
+    install_vars = [_element for _element in install_vars if _element not in failed]
+
+    if cancelled():
+        __log("INSTALL", "Installation cancelled")
+        __rollback([_element for _element in failed if _element not in existing], element_logs)
+        failed = []
+    else:
+        # failed elements are rolled back so they can be installed again, while their logs are kept
+        __rollback([_element for _element in failed if _element not in existing])
 
-        else:
-            raise NotImplementedError(f"{generator} is not supported")
+    if suppress_dump:
+        for _element in install_vars:
+            element_logs[_element].remove()
+
+    __invalidate_registry()
 
-        for element in install_vars:
-            __log("INSTALL", f"Installing {element}...")
+    if artifact_cache:
+        for _element in install_vars:
+            if keys[_element]:
+                __store_artifact(_element, artifact_cache, keys[_element])
+        install_vars = restored + install_vars
 
-            build_path = pathlib.Path(element) / "build"
-            build_path.mkdir(parents=True, exist_ok=True)
-            os.chdir(build_path)
+    global INSTALLED_ELEMS
+    # INSTALLED_ELEMS = f"Installed {', '.join([i[0] for i in install_vars])}"
+    INSTALLED_ELEMS = f"Installed {', '.join(install_vars)}"
+    if install_vars:
+        __log("INSTALL", INSTALLED_ELEMS)
+    if failed:
+        __log("INSTALL", f"Failed to install {', '.join(failed)}")
+        return 2
+    return 2 if cancelled() else 0
 
-            subprocess.call(cmake_cmd, shell=True, stdout=element_stdout, stderr=element_stderr)
-            subprocess.call(gen_cmd, shell=True, stdout=element_stdout, stderr=element_stderr)
 
-            os.chdir(ELEMENT_SRC_DIR)
+def __rollback(elements, element_logs=None):
+    """Remove the clones and builds of elements whose installation was interrupted or failed
 
-        global INSTALLED_ELEMS
-        # INSTALLED_ELEMS = f"Installed {', '.join([i[0] for i in install_vars])}"
-        INSTALLED_ELEMS = f"Installed {', '.join(install_vars)}"
-        __log("INSTALL", INSTALLED_ELEMS)
-        return 0
+    Entries registered by an interrupted build are removed from the SST configuration as well.
+
+    Parameters:
+    -----------
+    elements : list(str)
+        names of elements
+    element_logs : dict(str, buildlog.ElementLog) (default: None)
+        logs of each element, which are removed along with the element. Logs are kept if None.
+    """
+    registered = [_element for _element in elements if __registry_entries(_element)]
+    if registered:
+        __unregister(registered)
+    for _element in elements:
+        if pathlib.Path(_element).is_dir():
+            __trash(_element)
+            __log("INSTALL", f"Rolled back {_element}")
+        if element_logs:
+            element_logs[_element].remove()
 
-    return 2
+    __empty_trash()
 
 
-def __get_dependents(element):
-    """Gather elements that are dependent on the target element
+def __get_dependents(elements):
+    """Gather registered elements that are directly or indirectly dependent on the target elements
 
     Parameters:
     -----------
-    element : str
-        name of element
+    elements : list(str)
+        names of elements
 
     Returns:
     --------
     list(str)
-        list of element names flagged as dependents of the target element
+        list of element names flagged as dependents of the target elements
     """
-    __log("DEPEND", f"Gathering dependents of {element}...")
-    dependents = []
-    reg_elements = list_registered_elements()
-    all_elements = list_all_elements()
-    if element in reg_elements:
-        for _element in reg_elements:
-            if _element in all_elements and element in all_elements[_element]["dep"]:
-                dependents.append(_element)
+    __log("DEPEND", f"Gathering dependents of {', '.join(elements)}...")
+    reg_elements = set(list_registered_elements())
+    graph = __dependency_graph()
+    roots = [_element for _element in elements if _element in reg_elements and _element in graph]
+    if not roots:
+        return []
 
-    return dependents
+    # remove the furthest dependents first
+    dependents = graph.reverse_closure(roots) - set(elements)
+    return [_element for _element in graph.topological_order(dependents)[::-1]
+            if _element in reg_elements]
 
 
-def uninstall(element, force=False):
-    """Remove and uninstall element from system
+@__traced()
+def uninstall(element="", force=False, elements=None):
+    """Remove and uninstall elements from system
 
-    The path of the element is first located before a subprocess instance is created to avoid shell
-    injection
+    The elements are unregistered together in a single edit of the SST configuration file, and
+    their directories are moved to `TRASH_DIR` so that the call returns as soon as they are renamed.
+    The directories are then deleted by a detached process, which outlives the caller.
 
     Parameters:
     -----------
-    element : str
+    element : str (default: "")
         name of element
     force : bool (default: False)
-        flag to remove element as well as its dependent elements. This option is useful in forcing
-        up deprecated elements.
+        flag to remove elements as well as their dependent elements. This option is useful in
+        forcing up deprecated elements.
+    elements : list(str) (default: None)
+        names of additional elements to uninstall along with element
+    trace : str (default: None)
+        path of a file to export the time spent uninstalling every element to, as Chrome trace
+        events
+    progress : callable(progress.ProgressEvent) (default: None)
+        callback receiving the progress of the uninstallation. Events of the "uninstall" phase
+        without an element count the elements removed out of the elements to remove.
 
     Returns:
     --------
     int
-        return code for the GUI wrapper. Return 1 on success, 2 on failure.
+        return code for the GUI wrapper. Return 1 on success, 2 on failure, in which case no
+        element is removed.
     """
-    __log("REMOVE", f"Uninstalling {element}...")
-    elements = [element]
+    __configure()
+    roots = list(dict.fromkeys(([element] if element else []) + list(elements or [])))
+    __log("REMOVE", f"Uninstalling {', '.join(roots)}...")
+    elements = roots
     if force:
-        dependents = __get_dependents(element)
+        dependents = __get_dependents(roots)
         if dependents:
-            elements += dependents
-            __log("REMOVE", f"Uninstalling dependents of {element}: {', '.join(elements[1:])}...")
-
+            elements = roots + dependents
+            __log("REMOVE", f"Uninstalling dependents of {', '.join(roots)}: "
+                            f"{', '.join(dependents)}...")
+
+    missing = [_element for _element in elements if not pathlib.Path(_element).is_dir()]
+    for _element in missing:
+        __log("REMOVE", f"{_element} not found")
+    if missing:
+        return 2
+
+    for count, _element in enumerate(elements, 1):
+        with __span("uninstall", _element):
+            __trash(_element)
+        __emit(None, "uninstall", count, len(elements), f"{_element} removed")
+
+    __unregister(elements)
     for _element in elements:
-        if pathlib.Path(_element).is_dir():
-            shutil.rmtree(_element)
-            subprocess.call(
-                f"sst-register -u {_element}", shell=True, stdout=subprocess.DEVNULL
+        __log("REMOVE", f"{_element} uninstalled successfully")
+
+    __empty_trash()
+    return 1
+
+
+def __trash(element):
+    """Move the directory of element to the trash
+
+    The directory is renamed, which takes the same time whatever the size of the directory as long
+    as the trash is on the same file system.
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    """
+    TRASH_DIR.mkdir(exist_ok=True)
+    # every removal gets its own directory, so an element can be trashed again before its previous
+    # copy is deleted
+    trash = pathlib.Path(tempfile.mkdtemp(prefix=f"{element}.", dir=TRASH_DIR))
+    os.rename(element, trash / element)
+
+
+def __empty_trash():
+    """Delete the content of the trash in a detached process
+
+    The process runs in its own session, so the deletion carries on after the installer exits.
+    Directories left over by an interrupted deletion are deleted as well.
+    """
+    entries = [shlex.quote(str(path)) for path in TRASH_DIR.glob("*")]
+    if entries:
+        subprocess.Popen(f"rm -rf {' '.join(entries)}", shell=True, stdin=subprocess.DEVNULL,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+
+
+@contextlib.contextmanager
+def __registry_lock():
+    """Lock the SST configuration file against modifications by other threads and processes
+
+    The lock is shared with the wrapper of `sst-register` run by the builds.
+    """
+    try:
+        lock_file = __registry_lock_path().open("w")
+    except OSError:
+        yield
+        return
+
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def __registry_lock_path():
+    """Get the path of the lock file of the SST configuration file
+
+    Returns:
+    --------
+    pathlib.Path
+        path of the lock file, next to the configuration file
+    """
+    return SST_CONFIG_FILE.absolute().with_name(f".{SST_CONFIG_FILE.name}.lock")
+
+
+def __wrap_register(env):
+    """Put the wrapper of `sst-register` in front of the PATH of the builds
+
+    The wrapper is written under `CACHE_DIR` and runs the `sst-register` found on the PATH while
+    holding the lock of the SST configuration file.
+
+    Parameters:
+    -----------
+    env : dict(str, str)
+        environment the builds run in, which is modified in place
+    """
+    wrapper_dir = (pathlib.Path(ELEMENT_SRC_DIR) / CACHE_DIR / "bin").absolute()
+    # the wrapper left on the PATH by an enclosing installation is skipped
+    path = os.pathsep.join(entry for entry in env.get("PATH", "").split(os.pathsep)
+                           if not entry or pathlib.Path(entry).absolute() != wrapper_dir)
+    register = shutil.which("sst-register", path=path)
+    if not register:
+        return
+
+    wrapper_dir.mkdir(parents=True, exist_ok=True)
+    wrapper = wrapper_dir / "sst-register"
+    # concurrent installers replace the wrapper atomically
+    tmp_wrapper = wrapper.with_name(f".sst-register.{os.getpid()}.{threading.get_ident()}")
+    tmp_wrapper.write_text(REGISTER_WRAPPER.format(
+        python=sys.executable, lock=str(__registry_lock_path()), register=os.path.abspath(register)
+    ))
+    tmp_wrapper.chmod(0o755)
+    os.replace(tmp_wrapper, wrapper)
+    env["PATH"] = f"{wrapper_dir}{os.pathsep}{path}"
+
+
+def __unregister(elements):
+    """Remove the entries of elements from the SST configuration file
+
+    The entries of all elements are removed in a single edit of the configuration file, and the
+    edited copy replaces the file atomically. If the file cannot be edited, every element is
+    unregistered with `sst-register -u` instead.
+
+    Parameters:
+    -----------
+    elements : list(str)
+        names of elements
+    """
+    edited = SST_CONFIG_FILE.with_name(f".{SST_CONFIG_FILE.name}.{os.getpid()}")
+    with __registry_lock():
+        try:
+            lines = SST_CONFIG_FILE.read_text().splitlines(keepends=True)
+            edited.write_text("".join(__without_entries(lines, set(elements))))
+            shutil.copymode(SST_CONFIG_FILE, edited)
+            os.replace(edited, SST_CONFIG_FILE)
+        except (OSError, UnicodeDecodeError):
+            edited.unlink(missing_ok=True)
+            for _element in elements:
+                subprocess.call(f"sst-register -u {shlex.quote(_element)}", shell=True,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    __invalidate_registry()
+
+
+def __without_entries(lines, elements):
+    """Filter the entries of elements out of the lines of the SST configuration file
+
+    The file is filtered line by line rather than parsed, which keeps the comments and the layout
+    of the other entries.
+
+    Parameters:
+    -----------
+    lines : list(str)
+        lines of the configuration file
+    elements : set(str)
+        names of elements whose sections and keys are removed
+
+    Returns:
+    --------
+    list(str)
+        lines of the configuration file without the entries of elements
+    """
+    kept = []
+    section = None
+    removed = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            section = stripped[1:-1].strip()
+            removed = section in elements
+        # indented lines continue the value of the previous entry
+        elif not (line[:1].isspace() and stripped):
+            removed = section in elements or (
+                "=" in stripped and stripped.split("=", 1)[0].strip() in elements
             )
-            __log("REMOVE", f"{_element} uninstalled successfully")
+        if not removed:
+            kept.append(line)
+    return kept
 
-        else:
-            __log("REMOVE", f"{_element} not found")
-            return 2
 
-    return 1
+def __fetch_readme(url):
+    """Fetch a README through the on-disk cache of READMEs
+
+    Parameters:
+    -----------
+    url : str
+        URL of the README
+
+    Raises:
+    -------
+    urllib.error.HTTPError
+        README cannot be fetched
+    urllib.error.URLError
+        server cannot be reached and no cached copy exists
+
+    Returns:
+    --------
+    str
+        README content
+    """
+    if not CACHE:
+        with urllib.request.urlopen(url) as readme_file:
+            return readme_file.read().decode("utf-8")
+
+    cache_file = CACHE_DIR / "readmes" / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    return __fetch(url, cache_file)
 
 
 def get_info(element):
     """Get README of element
 
     If the element is installed, the local README contents and its path are returned. Else, the
-    README contents are grabbed from the element's repository.
+    README contents are grabbed from the element's repository. Every candidate README is requested
+    concurrently, and the most preferred README found is returned as soon as it is known. READMEs
+    are cached on disk and revalidated like the list of elements, and are kept in memory for at most
+    `CACHE_TTL` seconds.
 
     Parameters:
     -----------
@@ -398,6 +1595,8 @@ def get_info(element):
     -------
     FileNotFoundError
         requested element does not exist
+    urllib.error.URLError
+        repository of the element cannot be reached
 
     Returns:
     --------
@@ -406,36 +1605,95 @@ def get_info(element):
     str
         path or URL to README
     """
-    README_FILE_PATS = ("README.md", "README")
+    __configure()
     if element in list_registered_elements():
 
-        for file_name in README_FILE_PATS:
+        for file_name in README_FILES:
             file_path = pathlib.Path(element) / file_name
             if file_path.is_file():
                 with file_path.open() as readme_file:
-                    return readme_file.read(), file_path._str
+                    return readme_file.read(), str(file_path)
 
     else:
 
+        if CACHE and element in __READMES:
+            fetched, readme = __READMES[element]
+            if time.monotonic() - fetched < CACHE_TTL:
+                return readme
+
         all_elements = list_all_elements()
         if element in all_elements.keys():
-            for file_name in README_FILE_PATS:
-                readme_url = all_elements[element]["url"].replace("github", "raw.githubusercontent")
+            url = all_elements[element]["url"]
+            readme_url = url.replace("github", "raw.githubusercontent")
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(README_FILES))
+            futures = [pool.submit(__fetch_readme, f"{readme_url}/master/{file_name}")
+                       for file_name in README_FILES]
+            # the less preferred candidates still being fetched are not waited for
+            pool.shutdown(wait=False)
+
+            # a README is returned once every more preferred candidate is known to be missing
+            error = None
+            for future in futures:
                 try:
-                    readme_file = urllib.request.urlopen(f"{readme_url}/master/{file_name}")
+                    readme = future.result(), url
+                    __READMES[element] = time.monotonic(), readme
+                    return readme
                 except urllib.error.HTTPError:
                     continue
-                else:
-                    with readme_file:
-                        return readme_file.read().decode("utf-8"), all_elements[element]["url"]
+                except urllib.error.URLError as exc:
+                    error = error or exc
+
+            if error:
+                raise error
 
     # if an invalid element is requested
     raise FileNotFoundError(f"No information found on {element}")
 
 
-def list_all_elements():
+def get_info_many(elements):
+    """Get READMEs of multiple elements concurrently
+
+    At most `FETCH_WORKERS` READMEs are fetched at a time, which lets listings of elements prefetch
+    the READMEs of all their elements.
+
+    Parameters:
+    -----------
+    elements : list(str)
+        names of elements
+
+    Returns:
+    --------
+    dict(str, tuple(str, str))
+        README content and path or URL to README of every element, or None if no README of the
+        element can be found
+    """
+    __configure()
+    list_all_elements()
+    list_registered_elements()
+
+    readmes = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        futures = {pool.submit(get_info, _element): _element for _element in elements}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                readmes[futures[future]] = future.result()
+            except (FileNotFoundError, urllib.error.URLError):
+                readmes[futures[future]] = None
+
+    return {_element: readmes[_element] for _element in elements}
+
+
+def list_all_elements(refresh=False):
     """Grab official list of trusted elements
 
+    The list is fetched at most once per process and is cached under `CACHE_DIR` between
+    processes. Setting `CACHE` to False bypasses both caches.
+
+    Parameters:
+    -----------
+    refresh : bool (default: False)
+        flag to revalidate the cached list against the server
+
     Raises:
     -------
     FileNotFoundError
@@ -448,15 +1706,26 @@ def list_all_elements():
     dict(str, str)
         key-value pairs of elements mapped to their repository URLs
     """
+    __configure()
+    global __ALL_ELEMENTS
+    if CACHE and __ALL_ELEMENTS is not None and not refresh:
+        return __ALL_ELEMENTS
+
     try:
-        elements_list_file = urllib.request.urlopen(ELEMENT_LIST_URL)
+        if CACHE:
+            elements_list = __fetch(ELEMENT_LIST_URL, CACHE_DIR / "elements.json", refresh)
+        else:
+            with urllib.request.urlopen(ELEMENT_LIST_URL) as elements_list_file:
+                elements_list = elements_list_file.read().decode("utf-8")
 
     except urllib.error.HTTPError as exc:
         raise FileNotFoundError("Elements list file not found") from exc if exc.code == 404 else exc
 
-    else:
-        with elements_list_file:
-            return json.loads(elements_list_file.read().decode("utf-8"))
+    __ALL_ELEMENTS = json.loads(elements_list)
+    if refresh:
+        # READMEs are revalidated along with the list
+        __READMES.clear()
+    return __ALL_ELEMENTS
 
 
 def is_registered(element):
@@ -475,21 +1744,109 @@ def is_registered(element):
     return element in list_registered_elements()
 
 
+def __read_config():
+    """Parse the SST configuration file
+
+    Returns:
+    --------
+    configparser.ConfigParser or None
+        parsed configuration or None if the configuration file cannot be parsed
+    """
+    config = configparser.ConfigParser(delimiters=("=",), strict=False, interpolation=None)
+    # element names are case sensitive
+    config.optionxform = str
+    try:
+        if config.read(SST_CONFIG_FILE):
+            return config
+    except configparser.Error:
+        pass
+    return None
+
+
+def __read_registry():
+    """Parse the elements registered in the SST configuration file
+
+    `sst-register` lists the entries of the `SST_ELEMENT_SOURCE` section of the configuration file
+    as well as the elements registered with `sst-register <element> <element>_LIBDIR=<path>`, which
+    are read here directly to avoid spawning a process.
+
+    Returns:
+    --------
+    list(str) or None
+        list of registered elements or None if the configuration file cannot be parsed
+    """
+    config = __read_config()
+    if config is None:
+        return None
+
+    elements = []
+    if config.has_section("SST_ELEMENT_SOURCE"):
+        elements.extend(config["SST_ELEMENT_SOURCE"])
+    for section in config.sections():
+        if f"{section}_LIBDIR" in config[section] and section not in elements:
+            elements.append(section)
+    return elements
+
+
+def __registry_entries(element):
+    """Gather the entries registered for element in the SST configuration file
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+
+    Returns:
+    --------
+    list(tuple(str, str, str))
+        section, key and value of each entry registered for element
+    """
+    config = __read_config()
+    if config is None:
+        return []
+
+    return [(section, key, value) for section in config.sections()
+            for key, value in config[section].items() if element in (section, key)]
+
+
+def __invalidate_registry():
+    """Discard the snapshot of registered elements after the registry is modified"""
+    global __REGISTRY
+    __REGISTRY = None
+
+
 def list_registered_elements():
     """List elements installed in system
 
-    This function is a wrapper for the list option provided by SST
+    The registry is read once and held in memory until the SST configuration file is modified or
+    elements are installed or uninstalled. If the configuration file cannot be read, this function
+    falls back to the list option provided by SST.
 
     Returns:
     --------
     list(str)
         list of registered elements
     """
-    elements = subprocess.check_output("$(which sst-register) -l", shell=True).decode("utf-8")
-    return [match.group() for match in REG_ELEM_RE.finditer(elements)]
+    global __REGISTRY
+    try:
+        config_stat = SST_CONFIG_FILE.stat()
+        stamp = (config_stat.st_ino, config_stat.st_mtime_ns, config_stat.st_size)
+    except OSError:
+        stamp = None
+
+    if __REGISTRY is None or __REGISTRY[0] != stamp:
+        elements = __read_registry() if stamp else None
+        if elements is None:
+            elements = subprocess.check_output(
+                "$(which sst-register) -l", shell=True).decode("utf-8")
+            elements = [match.group() for match in REG_ELEM_RE.finditer(elements)]
+        __REGISTRY = (stamp, elements)
+
+    return list(__REGISTRY[1])
 
 
 def list_tests(element):
+    __configure()
 
     if element in list_registered_elements():
 
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Installation Progress
+
+This module describes the progress of the installation of elements as a stream of events.
+
+Events are emitted when an element enters or leaves a phase of its installation, when an element
+is done, and while the commands of a phase run. The progress of the commands is parsed from their
+output one line at a time as it is produced:
+    - git transfers, e.g. "Receiving objects:  45% (450/1000)", with `--progress`
+    - Ninja builds, e.g. "[12/340] Building CXX object ..."
+    - Makefile builds generated by CMake, e.g. "[ 45%] Building CXX object ..."
+
+Every line is first checked against a single character, so lines without progress information
+cost next to nothing to parse.
+"""
+import collections
+import re
+import sys
+import threading
+import time
+
+# progress of a phase of an element. current and total are None when the progress is unknown.
+ProgressEvent = collections.namedtuple(
+    "ProgressEvent", ("element", "phase", "current", "total", "message")
+)
+
+GIT_PROGRESS_RE = re.compile(
+    r"(?:remote: )?(?P<message>[A-Z][A-Za-z ]+):\s+\d+% \((?P<current>\d+)/(?P<total>\d+)\)"
+)
+NINJA_PROGRESS_RE = re.compile(r"\[(?P<current>\d+)/(?P<total>\d+)\] ")
+MAKE_PROGRESS_RE = re.compile(r"\[\s*(?P<current>\d+)%\] ")
+
+
+def parse(element, phase, line):
+    """Parse the progress of a phase from a line of output
+
+    Parameters:
+    -----------
+    element : str
+        name of element
+    phase : str
+        phase producing the line
+    line : str
+        line of output
+
+    Returns:
+    --------
+    ProgressEvent or None
+        progress reported by the line, or None if the line reports no progress
+    """
+    if phase == "clone":
+        if line[:1] not in ("R", "C", "r"):
+            return None
+        match = GIT_PROGRESS_RE.match(line)
+        if match:
+            return ProgressEvent(element, phase, int(match["current"]), int(match["total"]),
+                                 match["message"])
+
+    elif phase == "build" and line[:1] == "[":
+        match = NINJA_PROGRESS_RE.match(line)
+        if match:
+            return ProgressEvent(element, phase, int(match["current"]), int(match["total"]),
+                                 line[match.end():])
+        match = MAKE_PROGRESS_RE.match(line)
+        if match:
+            return ProgressEvent(element, phase, int(match["current"]), 100, line[match.end():])
+
+    return None
+
+
+class Estimator:
+    """Estimator of the time left in the phases of elements
+
+    The rate of progress of a phase is assumed to be constant from the first event of the phase.
+    """
+
+    def __init__(self):
+
+        self.__starts = {}
+        self.__lock = threading.Lock()
+
+    def eta(self, event):
+        """Estimate the time left in a phase
+
+        Parameters:
+        -----------
+        event : ProgressEvent
+            latest event of the phase
+
+        Returns:
+        --------
+        float or None
+            number of seconds left, or None if it cannot be estimated yet
+        """
+        now = time.monotonic()
+        with self.__lock:
+            start = self.__starts.setdefault((event.element, event.phase, event.total), now)
+
+        if not (event.current and event.total) or now == start:
+            return None
+        return (now - start) * (event.total - event.current) / event.current
+
+
+def format_eta(seconds):
+    """Format a number of seconds left as minutes and seconds
+
+    Parameters:
+    -----------
+    seconds : float or None
+        number of seconds left
+
+    Returns:
+    --------
+    str
+        formatted time left, or "--:--" if unknown
+    """
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class ConsoleProgress:
+    """Progress bar redrawn in place on a terminal
+
+    Instances are callable with progress events, from any thread.
+
+    Parameters:
+    -----------
+    stream : file (default: sys.stderr)
+        terminal to draw the progress bar on
+    width : int (default: 30)
+        number of characters of the bar
+    """
+
+    def __init__(self, stream=sys.stderr, width=30):
+
+        self.stream = stream
+        self.width = width
+        self.estimator = Estimator()
+        self.__lock = threading.Lock()
+
+    def __call__(self, event):
+
+        if event.total:
+            filled = self.width * min(event.current, event.total) // event.total
+            line = (f"{event.element or ''} {event.phase} "
+                    f"|{'#' * filled}{' ' * (self.width - filled)}| {event.current}/{event.total} "
+                    f"ETA {format_eta(self.estimator.eta(event))} {event.message}")
+        else:
+            line = f"{event.element or ''} {event.phase} {event.message}"
+
+        with self.__lock:
+            # the line is cleared before being redrawn in place
+            self.stream.write(f"\r\033[K{line.strip()[:120]}")
+            self.stream.flush()
+
+    def clear(self):
+        """Clear the progress bar, e.g. before other output is written to the terminal"""
+        with self.__lock:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Dependency Resolver
+
+This module resolves the dependency graph described by the official list of elements.
+
+The functionalities include:
+    - gathering direct dependencies and dependents of elements
+    - gathering transitive dependencies and dependents of elements
+    - ordering elements such that every element succeeds its dependencies
+    - grouping elements in levels that can be built concurrently
+    - detecting cyclic dependencies
+"""
+import collections
+
+
+class CyclicDependencyError(ValueError):
+    """Dependencies of elements form a cycle
+
+    Parameters:
+    -----------
+    cycle : list(str)
+        elements forming the cycle, starting and ending with the same element
+    """
+
+    def __init__(self, cycle):
+
+        self.cycle = cycle
+        super(CyclicDependencyError, self).__init__(f"Cyclic dependency: {' -> '.join(cycle)}")
+
+
+class DependencyGraph:
+    """Adjacency index of the dependencies of elements
+
+    Every query runs in time linear to the size of the subgraph it visits. The transitive
+    dependencies and dependents of every element queried are memoized, and later walks reaching the
+    element reuse them instead of visiting its subgraph again.
+
+    Parameters:
+    -----------
+    all_elements : dict(str, dict)
+        official list of elements, with the dependencies of each element listed under "dep"
+    """
+
+    def __init__(self, all_elements):
+
+        self.dependencies = {element: tuple(info["dep"]) for element, info in all_elements.items()}
+        self.dependents = {element: [] for element in self.dependencies}
+        for element, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents.setdefault(dep, []).append(element)
+
+        # position of every element in the official list
+        self.position = {element: index for index, element in enumerate(self.dependencies)}
+        # transitive dependencies and dependents of single elements
+        self.__closures = {False: {}, True: {}}
+
+    def __contains__(self, element):
+
+        return element in self.dependencies
+
+    def __edges(self, element, reverse=False):
+
+        if element not in self.dependencies:
+            raise FileNotFoundError(f"{element} not found")
+        return self.dependents[element] if reverse else self.dependencies[element]
+
+    def __walk(self, elements, reverse):
+
+        closures = self.__closures[reverse]
+        visited = set()
+        stack = list(elements)
+        while stack:
+            element = stack.pop()
+            if element in visited:
+                continue
+            if element in closures:
+                visited |= closures[element]
+            else:
+                visited.add(element)
+                stack.extend(self.__edges(element, reverse))
+
+        return visited
+
+    def __closure(self, elements, reverse):
+
+        elements = list(elements)
+        closures = self.__closures[reverse]
+        for element in elements:
+            if element not in closures:
+                closures[element] = frozenset(self.__walk([element], reverse))
+
+        return set().union(*(closures[element] for element in elements))
+
+    def get_dependencies(self, element):
+        """Gather direct dependencies of element
+
+        Parameters:
+        -----------
+        element : str
+            name of element
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element does not exist
+
+        Returns:
+        --------
+        list(str)
+            dependencies of element
+        """
+        return list(self.__edges(element))
+
+    def get_dependents(self, element):
+        """Gather elements directly depending on element
+
+        Parameters:
+        -----------
+        element : str
+            name of element
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element does not exist
+
+        Returns:
+        --------
+        list(str)
+            dependents of element
+        """
+        return list(self.__edges(element, reverse=True))
+
+    def closure(self, elements):
+        """Gather elements along with all their direct and indirect dependencies
+
+        Parameters:
+        -----------
+        elements : iterable(str)
+            names of elements
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element or one of its dependencies does not exist
+
+        Returns:
+        --------
+        set(str)
+            elements and their transitive dependencies
+        """
+        return self.__closure(elements, reverse=False)
+
+    def reverse_closure(self, elements):
+        """Gather elements along with all elements directly or indirectly depending on them
+
+        Parameters:
+        -----------
+        elements : iterable(str)
+            names of elements
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element does not exist
+
+        Returns:
+        --------
+        set(str)
+            elements and their transitive dependents
+        """
+        return self.__closure(elements, reverse=True)
+
+    def levels(self, elements):
+        """Group elements in topological levels with Kahn's algorithm
+
+        Only the dependencies among the given elements are considered. Elements of a level only
+        depend on elements of the preceding levels, and can therefore be built concurrently.
+        Elements keep their order in the official list within a level.
+
+        Parameters:
+        -----------
+        elements : iterable(str)
+            names of elements
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element does not exist
+        CyclicDependencyError
+            dependencies of the elements form a cycle
+
+        Returns:
+        --------
+        list(list(str))
+            elements grouped in topological levels
+        """
+        elements = set(elements)
+        for element in elements:
+            self.__edges(element)
+
+        ordered = sorted(elements, key=self.position.get)
+        in_degree = {
+            element: sum(dep in elements for dep in self.dependencies[element])
+            for element in ordered
+        }
+
+        levels = []
+        level = [element for element in ordered if not in_degree[element]]
+        while level:
+            levels.append(level)
+            next_level = []
+            for element in level:
+                for dependent in self.dependents[element]:
+                    if dependent in in_degree:
+                        in_degree[dependent] -= 1
+                        if not in_degree[dependent]:
+                            next_level.append(dependent)
+            level = sorted(next_level, key=self.position.get)
+
+        if sum(map(len, levels)) < len(ordered):
+            raise CyclicDependencyError(self.__find_cycle(
+                {element for element, degree in in_degree.items() if degree}
+            ))
+
+        return levels
+
+    def topological_order(self, elements):
+        """Order elements such that every element succeeds its dependencies
+
+        Parameters:
+        -----------
+        elements : iterable(str)
+            names of elements
+
+        Raises:
+        -------
+        FileNotFoundError
+            requested element does not exist
+        CyclicDependencyError
+            dependencies of the elements form a cycle
+
+        Returns:
+        --------
+        list(str)
+            ordered elements
+        """
+        return [element for level in self.levels(elements) for element in level]
+
+    def __find_cycle(self, remaining):
+
+        # every element left over by Kahn's algorithm depends on another left over element, so
+        # following the dependencies eventually revisits an element
+        path = collections.OrderedDict()
+        element = min(remaining)
+        while element not in path:
+            path[element] = None
+            element = next(dep for dep in self.dependencies[element] if dep in remaining)
+
+        cycle = list(path)
+        cycle = cycle[cycle.index(element):]
+        return cycle + [element]
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Build Scheduler
+
+This module schedules the builds of elements such that elements independent of each other are
+built concurrently while sharing a single budget of jobs.
+
+The elements are built in topological levels, where every element of a level only depends on
+elements of preceding levels. The budget of jobs is divided between the concurrent builds of a
+level. Makefile builds draw their jobs from a GNU make jobserver, so a build that finishes early
+returns its jobs to the builds still running.
+
+The budget of jobs can be sized from the resources the process is allowed to use: the CPUs of its
+affinity mask, the CPU and memory quotas of its cgroup (v1 or v2), e.g. in a Slurm allocation or a
+container, and the memory required by every compile job.
+"""
+import concurrent.futures
+import math
+import os
+import pathlib
+
+CGROUP_ROOT = pathlib.Path("/sys/fs/cgroup")
+PROC_CGROUP = pathlib.Path("/proc/self/cgroup")
+
+
+def __read(path):
+
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def __cgroup_files(v2_name, v1_controller, v1_name):
+    """Locate a file of a cgroup controller in the cgroup of the process and all its ancestors
+
+    The limits of every ancestor of a cgroup apply to the cgroup as well.
+
+    Parameters:
+    -----------
+    v2_name : str
+        name of the file in cgroup v2 hierarchies
+    v1_controller : str
+        name of the controller in cgroup v1 hierarchies
+    v1_name : str
+        name of the file in cgroup v1 hierarchies
+
+    Returns:
+    --------
+    list(pathlib.Path)
+        paths to the file from the cgroup of the process up to the root, which may not exist
+    """
+    cgroups = __read(PROC_CGROUP)
+    if not cgroups:
+        return []
+
+    files = []
+    for line in cgroups.splitlines():
+        _, controllers, path = line.split(":", 2)
+        if not controllers:
+            # hybrid hierarchies mount cgroup v2 apart from the v1 controllers
+            root = (CGROUP_ROOT if (CGROUP_ROOT / "cgroup.controllers").exists()
+                    else CGROUP_ROOT / "unified")
+            name = v2_name
+        elif v1_controller in controllers.split(","):
+            root, name = CGROUP_ROOT / controllers, v1_name
+        else:
+            continue
+
+        # in a container without a cgroup namespace, the cgroup of the process is mounted at root
+        directory = root / path.lstrip("/")
+        files.append(directory / name)
+        while directory != root and root in directory.parents:
+            directory = directory.parent
+            files.append(directory / name)
+
+    return files
+
+
+def cpu_limit():
+    """Count the CPUs the process is allowed to use
+
+    Returns:
+    --------
+    int
+        number of CPUs of the affinity mask of the process, lowered to the CPU quota of its cgroup
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    for path in __cgroup_files("cpu.max", "cpu", "cpu.cfs_quota_us"):
+        quota = __read(path)
+        if path.name == "cpu.max":
+            quota, period = quota.split() if quota else (None, None)
+        else:
+            period = __read(path.with_name("cpu.cfs_period_us"))
+        # quotas are unlimited by default
+        if quota in (None, "max", "-1") or not period:
+            continue
+        cpus = min(cpus, max(math.ceil(int(quota) / int(period)), 1))
+
+    return cpus
+
+
+def available_memory():
+    """Measure the memory available to the process
+
+    Returns:
+    --------
+    int or None
+        number of bytes available on the system, lowered to the memory left in the cgroup of the
+        process, or None if it cannot be measured
+    """
+    available = None
+    meminfo = __read(pathlib.Path("/proc/meminfo"))
+    for line in (meminfo or "").splitlines():
+        if line.startswith("MemAvailable:"):
+            available = int(line.split()[1]) * 1024
+
+    for path in __cgroup_files("memory.max", "memory", "memory.limit_in_bytes"):
+        limit = __read(path)
+        # an unlimited cgroup v1 reports a limit larger than any memory
+        if limit in (None, "max"):
+            continue
+        usage = __read(path.with_name(
+            "memory.current" if path.name == "memory.max" else "memory.usage_in_bytes"
+        ))
+        left = max(int(limit) - int(usage or 0), 0)
+        available = left if available is None else min(available, left)
+
+    return available
+
+
+def auto_jobs(memory_per_job, extra=0):
+    """Size the budget of jobs from the resources the process is allowed to use
+
+    Parameters:
+    -----------
+    memory_per_job : int
+        number of bytes of memory required by a compile job
+    extra : int (default: 0)
+        number of jobs added to the number of CPUs, e.g. to keep the CPUs busy while jobs wait on
+        I/O
+
+    Returns:
+    --------
+    tuple(int, int, str)
+        number of jobs, maximum load average under which new jobs are started, and description of
+        the limits the number of jobs was sized from
+    """
+    cpus = cpu_limit()
+    jobs = cpus + extra
+    limits = [f"{cpus} CPU(s)"]
+
+    memory = available_memory()
+    if memory is not None:
+        memory_jobs = max(memory // memory_per_job, 1)
+        jobs = min(jobs, memory_jobs)
+        limits.append(f"{memory / 2 ** 30:.1f} GiB of memory for {memory_jobs} job(s)")
+
+    # the load average is shared by every process of the system
+    max_load = os.cpu_count() or cpus
+    limits.append(f"load average below {max_load}")
+    return jobs, max_load, ", ".join(limits)
+
+
+class JobServer:
+    """GNU make jobserver shared by concurrent builds
+
+    Every make process connected to the jobserver runs one job without a token and acquires a token
+    from the pipe for each additional job. A jobserver shared by `n` builds should therefore hold
+    `n` tokens less than the total number of jobs.
+
+    Parameters:
+    -----------
+    tokens : int
+        number of tokens in the jobserver
+    max_load : int (default: None)
+        maximum load average under which the make processes start new jobs
+    """
+
+    def __init__(self, tokens, max_load=None):
+
+        self.max_load = max_load
+        self.fds = os.pipe()
+        os.write(self.fds[1], b"+" * tokens)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.close()
+
+    def env(self, environ=None):
+        """Generate the environment that connects a make process to the jobserver
+
+        Parameters:
+        -----------
+        environ : dict(str, str) (default: None)
+            environment to extend. Defaults to the environment of the current process.
+
+        Returns:
+        --------
+        dict(str, str)
+            environment with the jobserver declared in MAKEFLAGS
+        """
+        environ = dict(os.environ if environ is None else environ)
+        environ["MAKEFLAGS"] = f"-j --jobserver-auth={self.fds[0]},{self.fds[1]}"
+        if self.max_load:
+            environ["MAKEFLAGS"] += f" -l {self.max_load}"
+        return environ
+
+    def close(self):
+        """Close both ends of the jobserver pipe"""
+        for fd in self.fds:
+            os.close(fd)
+
+
+def run_levels(levels, build, budget, dependencies, jobserver=False, cancel=None, max_load=None):
+    """Build levels of elements one after another with the elements of each level built concurrently
+
+    An element is skipped if any of its dependencies failed to build or was skipped. Once the builds
+    are cancelled, the levels not started yet are skipped as well.
+
+    Parameters:
+    -----------
+    levels : list(list(str))
+        elements grouped in topological levels
+    build : callable(str, int, JobServer) -> bool
+        function building an element with a number of jobs and an optional jobserver, returning if
+        the element was built successfully
+    budget : int
+        total number of jobs shared by the concurrent builds
+    dependencies : dict(str, list(str))
+        dependencies of each element
+    jobserver : bool (default: False)
+        flag to share the jobs of each level through a GNU make jobserver
+    cancel : threading.Event (default: None)
+        event set to skip the levels not started yet
+    max_load : int (default: None)
+        maximum load average under which the make processes connected to the jobserver start new
+        jobs
+
+    Returns:
+    --------
+    list(str)
+        elements that failed to build or were skipped
+    """
+    failed = []
+    for level in levels:
+
+        if cancel and cancel.is_set():
+            failed += level
+            continue
+
+        ready = [element for element in level
+                 if not any(dep in failed for dep in dependencies.get(element, ()))]
+        failed += [element for element in level if element not in ready]
+        if not ready:
+            continue
+
+        workers = min(len(ready), budget)
+        jobs = max(budget // workers, 1)
+        server = JobServer(budget - workers, max_load) if jobserver else None
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                       thread_name_prefix="build") as pool:
+                futures = {pool.submit(build, element, jobs, server): element for element in ready}
+                for future in concurrent.futures.as_completed(futures):
+                    if not future.result():
+                        failed.append(futures[future])
+        finally:
+            if server:
+                server.close()
+
+    return failed
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""SST Elements Installation Timing
+
+This module measures the phases of the installation of elements, e.g. clone, configure and build.
+
+The wall time and CPU time of every phase are recorded as spans. The CPU time of a phase includes
+the CPU time of the commands run during the phase and all of their descendants. The spans can be
+exported as Chrome trace events, to be viewed in chrome://tracing or Perfetto, and summarized per
+element in a table. Every worker thread is given its own track, so concurrent clones and builds
+appear side by side along with the gaps between them.
+"""
+import contextlib
+import json
+import os
+import subprocess
+import threading
+import time
+
+PHASES = ("uninstall", "restore", "register", "clone", "configure", "build")
+
+
+def wait(process):
+    """Wait for a process to terminate and measure its CPU time
+
+    Parameters:
+    -----------
+    process : subprocess.Popen
+        process to wait for. Its return code is set once it terminates.
+
+    Returns:
+    --------
+    float
+        user and system CPU time of the process and its descendants in seconds
+    """
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return rusage.ru_utime + rusage.ru_stime
+
+
+def call(cmd, **kwargs):
+    """Run a shell command and measure its CPU time
+
+    Parameters:
+    -----------
+    cmd : str
+        shell command to run
+    **kwargs
+        keyword arguments passed to `subprocess.Popen`
+
+    Returns:
+    --------
+    tuple(int, float)
+        exit code and CPU time of the command in seconds
+    """
+    with subprocess.Popen(cmd, shell=True, **kwargs) as process:
+        cpu_time = wait(process)
+    return process.returncode, cpu_time
+
+
+class Tracer:
+    """Recorder of the spans of the phases of an installation"""
+
+    def __init__(self):
+
+        self.start = time.perf_counter()
+        self.events = []
+        self.__tracks = {}
+        self.__lock = threading.Lock()
+
+    def __track(self):
+
+        # threads of a pool are named after their position in the pool, so a pool recreated for
+        # every level of builds reuses the same tracks
+        name = threading.current_thread().name
+        with self.__lock:
+            return self.__tracks.setdefault(name, len(self.__tracks))
+
+    @contextlib.contextmanager
+    def span(self, phase, element):
+        """Record the span of a phase of an element
+
+        The CPU time of the calling thread is measured. The CPU time of child processes is to be
+        added to the "child_cpu" entry of the yielded record.
+
+        Parameters:
+        -----------
+        phase : str
+            name of phase
+        element : str
+            name of element
+
+        Yields:
+        -------
+        dict
+            record of the span
+        """
+        record = {"child_cpu": 0.0}
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu + record["child_cpu"]
+            event = {
+                "name": f"{phase} {element}", "cat": phase, "ph": "X",
+                "ts": (start_wall - self.start) * 1e6, "dur": wall * 1e6,
+                "pid": os.getpid(), "tid": self.__track(),
+                "args": {"element": element, "cpu_ms": round(cpu * 1e3, 3)},
+            }
+            with self.__lock:
+                self.events.append(event)
+
+    def write(self, path):
+        """Export the spans as Chrome trace events
+
+        Parameters:
+        -----------
+        path : str or pathlib.Path
+            path of the JSON trace file
+        """
+        with self.__lock:
+            events = list(self.events)
+            tracks = dict(self.__tracks)
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+             "args": {"name": name}}
+            for name, tid in tracks.items()
+        ]
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, trace_file)
+
+    def summary(self):
+        """Summarize the wall time of the phases of every element
+
+        Returns:
+        --------
+        str
+            table of the wall time in seconds spent by every element in each phase, along with the
+            total wall and CPU times of each element
+        """
+        with self.__lock:
+            events = list(self.events)
+
+        phases = [phase for phase in PHASES if any(event["cat"] == phase for event in events)]
+        rows = {}
+        for event in events:
+            row = rows.setdefault(event["args"]["element"], dict.fromkeys(phases + ["cpu"], 0.0))
+            row[event["cat"]] += event["dur"] / 1e6
+            row["cpu"] += event["args"]["cpu_ms"] / 1e3
+
+        width = max([len("element")] + [len(element) for element in rows]) + 2
+        header = "element".ljust(width) + "".join(
+            f"{column:>11}" for column in phases + ["total", "cpu"]
+        )
+        lines = [header, "-" * len(header)]
+        for element, row in rows.items():
+            total = sum(row[phase] for phase in phases)
+            values = [row[phase] for phase in phases] + [total, row["cpu"]]
+            lines.append(element.ljust(width) + "".join(f"{value:>11.2f}" for value in values))
+
+        elapsed = time.perf_counter() - self.start
+        busy = sum(event["dur"] for event in events) / 1e6
+        lines.append(f"Elapsed {elapsed:.2f}s for {busy:.2f}s of phases")
+        return "\n".join(lines)
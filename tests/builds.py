@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import json
+import sys
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import installer
+
+# reads the configuration file and rewrites it a while later, as a slow `sst-register` would
+RACY_REGISTER = """#!/usr/bin/env python3
+import os
+import sys
+import time
+
+path = os.environ["SST_CONFIG_FILE"]
+with open(path) as config_file:
+    config = config_file.read()
+time.sleep(0.2)
+element, option = sys.argv[1:3]
+with open(path, "w") as config_file:
+    config_file.write(f"{config}[{element}]\\n{option.replace('=', ' = ', 1)}\\n\\n")
+"""
+
+
+def test_parallel_registration(environment):
+    """Register elements built concurrently
+
+    This method verifies that no registration is lost when independent elements are registered
+    at the same time.
+    """
+    (environment / "bin" / "sst-register").write_text(RACY_REGISTER)
+    list_file = environment / "elements.json"
+    elements = json.loads(list_file.read_text())
+    for info in elements.values():
+        info["dep"] = []
+    list_file.write_text(json.dumps(elements))
+
+    assert installer.install(elements=list(elements), n_jobs=len(elements)) == 0
+    assert sorted(installer.list_registered_elements()) == sorted(elements)
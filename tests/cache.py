@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import io
+import json
+import sys
+import tarfile
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import artifacts
+import installer
+import resolver
+
+
+def test_round_trip(tmp_path):
+    """Unpack a stored element along with its metadata
+
+    This method verifies that the element directory, including relative links, is restored.
+    """
+    element_path = tmp_path / "src" / "hermes"
+    (element_path / "build").mkdir(parents=True)
+    (element_path / "build" / "libhermes.so.1").write_text("library")
+    (element_path / "build" / "libhermes.so").symlink_to("libhermes.so.1")
+
+    artifacts.store(tmp_path / "cache", "key", element_path, {"element": "hermes"})
+    restored_path = tmp_path / "restored" / "hermes"
+    restored_path.parent.mkdir()
+
+    assert artifacts.fetch(tmp_path / "cache", "key", restored_path) == {"element": "hermes"}
+    assert (restored_path / "build" / "libhermes.so").read_text() == "library"
+    assert artifacts.fetch(tmp_path / "cache", "missing", tmp_path / "missing") is None
+
+
+@pytest.mark.parametrize("data_filter", [True, False])
+@pytest.mark.parametrize("name", ["../evil", "{tmp_path}/evil", "hermes/link"])
+def test_unsafe_archive(tmp_path, monkeypatch, data_filter, name):
+    """Refuse archives writing outside of the element directory
+
+    This method verifies that nothing is written outside of the element directory by crafted
+    archives, with or without the extraction filters of `tarfile`.
+    """
+    if not data_filter:
+        monkeypatch.delattr(tarfile, "data_filter", raising=False)
+    member = tarfile.TarInfo(name.format(tmp_path=tmp_path))
+    if name == "hermes/link":
+        member.type, member.linkname = tarfile.SYMTYPE, "../../../evil"
+    directory = tarfile.TarInfo("hermes")
+    directory.type = tarfile.DIRTYPE
+
+    (tmp_path / "cache").mkdir()
+    with tarfile.open(tmp_path / "cache" / "key.tar.gz", "w:gz") as archive:
+        metadata = json.dumps({"element": "hermes"}).encode("utf-8")
+        info = tarfile.TarInfo(artifacts.METADATA_FILE)
+        info.size = len(metadata)
+        archive.addfile(info, io.BytesIO(metadata))
+        archive.addfile(directory)
+        archive.addfile(member, io.BytesIO(b""))
+
+    element_path = tmp_path / "src" / "hermes"
+    element_path.parent.mkdir()
+
+    # the data filter drops the leading slash of absolute names instead of refusing them
+    if data_filter and name.startswith("{"):
+        assert artifacts.fetch(tmp_path / "cache", "key", element_path) is not None
+    else:
+        assert artifacts.fetch(tmp_path / "cache", "key", element_path) is None
+        assert not element_path.exists()
+    assert not (tmp_path / "evil").exists()
+
+
+def test_source_directory(environment, monkeypatch):
+    """Key artifacts by the directory the elements are built in
+
+    This method verifies that installers building in different directories do not share artifacts,
+    since build trees hold absolute paths.
+    """
+    graph = resolver.DependencyGraph(installer.list_all_elements())
+    artifact_keys = getattr(installer, "__artifact_keys")
+    keys = artifact_keys(graph, ["element0000"], ["element0000"], {}, "makefile", {})
+    assert keys["element0000"]
+
+    (environment / "other").mkdir()
+    monkeypatch.setattr(installer, "ELEMENT_SRC_DIR", str(environment / "other"))
+    assert artifact_keys(graph, ["element0000"], ["element0000"], {}, "makefile", {}) != keys
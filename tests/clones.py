@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import urllib.error
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import buildlog
+import installer
+
+clone = getattr(installer, "__clone")
+
+
+def git(cmd, cwd):
+
+    return subprocess.check_output(f"git {cmd}", shell=True, cwd=cwd).decode("utf-8").strip()
+
+
+def add_commits(environment, count, branch="master"):
+    """Push commits to the repository shared by the elements and return the SHAs of the branch"""
+    work_dir = environment / "work"
+    git(f"checkout -q {branch} 2>/dev/null || git checkout -q -b {branch}", work_dir)
+    for index in range(count):
+        message = f"{branch} {git('rev-list --count HEAD', work_dir)}"
+        (work_dir / "element.c").write_text(f"/* {message} */\nint element(void) {{ return 0; }}\n")
+        git(f"commit -q -am '{message}'", work_dir)
+    git(f"push -q -f {environment / 'element.git'} {branch}", work_dir)
+    return git("rev-list --reverse HEAD", work_dir).split()
+
+
+@pytest.fixture
+def repository(environment):
+
+    shas = add_commits(environment, 2)
+    # partial clones are only served if filters are allowed
+    git("config uploadpack.allowFilter true", environment / "element.git")
+    getattr(installer, "__configure")()
+    return environment, shas
+
+
+def log(environment, element="element0000"):
+
+    return buildlog.ElementLog(element, log_dir=environment / "logs")
+
+
+@pytest.mark.parametrize("clone_mode, count", [("full", 3), ("shallow", 1), ("partial", 3)])
+def test_clone_modes(repository, clone_mode, count):
+    """Clone the head of a branch with every clone strategy
+
+    This method verifies that shallow clones skip the history, partial clones keep it while
+    filtering the files, and every clone points to the repository of the element.
+    """
+    environment, shas = repository
+    clone("element0000", clone_mode=clone_mode, mirror=False, element_log=log(environment))
+    element_path = environment / "src" / "element0000"
+
+    assert git("rev-parse HEAD", element_path) == shas[-1]
+    assert git("rev-list --count HEAD", element_path) == str(count)
+    assert git("remote get-url origin", element_path) == (environment / "element.git").as_uri()
+    if clone_mode == "partial":
+        assert git("config remote.origin.partialclonefilter", element_path) == "blob:none"
+
+
+@pytest.mark.parametrize("clone_mode", ["full", "shallow", "partial"])
+@pytest.mark.parametrize("abbreviated", [False, True])
+def test_pinned(repository, clone_mode, abbreviated):
+    """Clone a commit pinned by its full or abbreviated SHA
+
+    This method verifies that shallow clones of a full SHA fetch the commit alone.
+    """
+    environment, shas = repository
+    commit = shas[0][:12] if abbreviated else shas[0]
+    clone("element0000", commit=commit, clone_mode=clone_mode, mirror=False,
+          element_log=log(environment))
+    element_path = environment / "src" / "element0000"
+
+    assert git("rev-parse HEAD", element_path) == shas[0]
+    if clone_mode == "shallow" and not abbreviated:
+        assert git("rev-list --count HEAD", element_path) == "1"
+
+
+def test_mirror(repository):
+    """Clone full clones from a mirror holding the requested branches
+
+    This method verifies that the clone points to the repository of the element, and that the
+    branches cloned later are added to the mirror and updated with it.
+    """
+    environment, shas = repository
+    clone("element0000", element_log=log(environment))
+    mirror_path = environment / "src" / installer.MIRROR_DIR / "element0000.git"
+    element_path = environment / "src" / "element0000"
+
+    assert git("rev-parse master", mirror_path) == shas[-1]
+    assert git("remote get-url origin", element_path) == (environment / "element.git").as_uri()
+
+    # installations remove the previous clone first
+    shutil.rmtree(element_path)
+    feature_shas = add_commits(environment, 1, branch="feature")
+    clone("element0000", branch="feature", element_log=log(environment))
+    assert git("rev-parse feature", mirror_path) == feature_shas[-1]
+
+    master_shas = add_commits(environment, 1)
+    assert installer.update_mirrors() == ["element0000"]
+    assert git("rev-parse master", mirror_path) == master_shas[-1]
+    assert git("rev-parse feature", mirror_path) == feature_shas[-1]
+
+
+def test_concurrent_mirror(repository):
+    """Create a mirror requested by concurrent installers once
+
+    This method verifies that the mirror is locked while it is created and fetched, so every
+    installer finds a complete mirror and the branch is only added once to its refspecs.
+    """
+    environment, shas = repository
+    update_mirror = getattr(installer, "__update_mirror")
+    url = (environment / "element.git").as_uri()
+    errors = []
+
+    def mirror(index):
+        try:
+            mirror_path = update_mirror("element0000", url, log(environment, f"mirror{index}"),
+                                        "master")
+            assert git("rev-parse master", mirror_path) == shas[-1]
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=mirror, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    mirror_path = environment / "src" / installer.MIRROR_DIR / "element0000.git"
+    assert errors == []
+    assert git("config --get-all remote.origin.fetch", mirror_path).split() == [
+        "+refs/heads/master:refs/heads/master"
+    ]
+
+
+@pytest.mark.parametrize("mirror", [True, False])
+def test_update(repository, mirror):
+    """Update a clone in place to the head of a branch or a pinned commit
+
+    This method verifies that local changes to tracked files are discarded while the build
+    directory and the timestamps of unchanged files are kept.
+    """
+    environment, shas = repository
+    clone("element0000", commit=shas[0], mirror=mirror, element_log=log(environment))
+    element_path = environment / "src" / "element0000"
+    (element_path / "build").mkdir()
+    (element_path / "build" / "libelement0000.so").write_text("library")
+    (element_path / "element.c").write_text("modified")
+    lists_mtime = (element_path / "CMakeLists.txt").stat().st_mtime_ns
+
+    clone("element0000", mirror=mirror, update=True, element_log=log(environment))
+    assert git("rev-parse HEAD", element_path) == shas[-1]
+    assert git("status --porcelain --untracked-files=no", element_path) == ""
+    assert (element_path / "build" / "libelement0000.so").read_text() == "library"
+    assert (element_path / "CMakeLists.txt").stat().st_mtime_ns == lists_mtime
+
+    feature_shas = add_commits(environment, 1, branch="feature")
+    clone("element0000", branch="feature", mirror=mirror, update=True,
+          element_log=log(environment))
+    assert git("rev-parse --abbrev-ref HEAD", element_path) == "feature"
+    assert git("rev-parse HEAD", element_path) == feature_shas[-1]
+
+    clone("element0000", commit=shas[1][:12], mirror=mirror, update=True,
+          element_log=log(environment))
+    assert git("rev-parse --abbrev-ref HEAD", element_path) == "master"
+    assert git("rev-parse HEAD", element_path) == shas[1]
+
+
+def test_clone_all(repository, monkeypatch):
+    """Clone the repositories of elements concurrently
+
+    This method verifies that a failed clone neither interrupts the others nor goes unreported.
+    """
+    environment, shas = repository
+    list_file = environment / "elements.json"
+    elements = json.loads(list_file.read_text())
+    elements["element0003"]["url"] = (environment / "missing.git").as_uri()
+    list_file.write_text(json.dumps(elements))
+
+    # the clones overlap if they run concurrently
+    running = []
+    overlapped = threading.Event()
+    update_mirror = getattr(installer, "__update_mirror")
+
+    def slow_mirror(element, *args):
+        running.append(element)
+        if len(running) > 1:
+            overlapped.set()
+        overlapped.wait(5)
+        return update_mirror(element, *args)
+
+    monkeypatch.setattr(installer, "__update_mirror", slow_mirror)
+    names = [f"element000{index}" for index in range(5)]
+    with pytest.raises(urllib.error.URLError, match="element0003"):
+        getattr(installer, "__clone_all")(
+            names, {}, {name: log(environment, name) for name in names}
+        )
+
+    assert overlapped.is_set()
+    for name in names:
+        assert (environment / "src" / name / ".git").is_dir() == (name != "element0003")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import sys
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR.parent / "benchmarks"))
+import installer
+import suite
+
+
+@pytest.fixture
+def environment(tmp_path, monkeypatch):
+    """Point the installer to a synthetic environment of 8 elements with none registered
+
+    The elements, repository and fake SST scripts are those of the benchmark suite.
+    """
+    env = suite.create_environment(tmp_path, 8, registered=0)
+    for var in ("PATH", "SST_CONFIG_FILE", "GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME",
+                "GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, env[var])
+    monkeypatch.setattr(installer, "ELEMENT_LIST_URL", env["ELEMENT_LIST_URL"])
+    monkeypatch.setattr(installer, "ELEMENT_SRC_DIR", env["ELEMENT_SRC_DIR"])
+    monkeypatch.setattr(installer, "SST_CONFIG_FILE", Path(env["SST_CONFIG_FILE"]))
+    monkeypatch.setattr(installer, "ARTIFACT_DIR", None)
+    monkeypatch.setattr(installer, "LOG", False)
+    for var, value in (("__CONFIGURED", False), ("__ALL_ELEMENTS", None), ("__REGISTRY", None),
+                       ("__GRAPH", None), ("__READMES", {})):
+        monkeypatch.setattr(installer, var, value)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import resolver
+
+ALL_ELEMENTS = {
+    "hermes": {"dep": ["thornhill"]},
+    "memHierarchy": {"dep": []},
+    "miranda": {"dep": []},
+    "Samba": {"dep": ["memHierarchy"]},
+    "thornhill": {"dep": ["miranda"]},
+    "zodiac": {"dep": ["hermes", "thornhill", "miranda"]},
+}
+
+
+def test_closure():
+    """Gather transitive dependencies and dependents of elements
+
+    This method verifies the closures of the dependency graph in both directions.
+    """
+    graph = resolver.DependencyGraph(ALL_ELEMENTS)
+
+    assert graph.closure(["zodiac"]) == {"zodiac", "hermes", "thornhill", "miranda"}
+    assert graph.closure(["zodiac", "Samba"]) == {
+        "zodiac", "hermes", "thornhill", "miranda", "Samba", "memHierarchy"
+    }
+    assert graph.reverse_closure(["miranda"]) == {"miranda", "thornhill", "hermes", "zodiac"}
+
+
+def test_memoized_closure():
+    """Reuse the closures of elements queried before
+
+    This method verifies that closures reaching memoized elements match the closures walked in full.
+    """
+    graph = resolver.DependencyGraph(ALL_ELEMENTS)
+
+    assert graph.closure(["thornhill"]) == {"thornhill", "miranda"}
+    assert graph.closure(["hermes"]) == {"hermes", "thornhill", "miranda"}
+    assert graph.closure(iter(["zodiac", "Samba"])) == {
+        "zodiac", "hermes", "thornhill", "miranda", "Samba", "memHierarchy"
+    }
+    assert graph.reverse_closure(["thornhill"]) == {"thornhill", "hermes", "zodiac"}
+    assert graph.reverse_closure(["miranda"]) == {"miranda", "thornhill", "hermes", "zodiac"}
+
+    # memoized closures are not modified by the sets returned
+    graph.closure(["hermes"]).add("Samba")
+    assert graph.closure(["hermes"]) == {"hermes", "thornhill", "miranda"}
+
+
+def test_levels():
+    """Group elements in topological levels
+
+    This method verifies that every element is grouped after its dependencies and that independent
+    elements share a level.
+    """
+    graph = resolver.DependencyGraph(ALL_ELEMENTS)
+
+    assert graph.levels(graph.closure(["zodiac", "Samba"])) == [
+        ["memHierarchy", "miranda"], ["Samba", "thornhill"], ["hermes"], ["zodiac"]
+    ]
+    # dependencies outside of the requested elements are ignored
+    assert graph.levels(["hermes", "zodiac"]) == [["hermes"], ["zodiac"]]
+
+
+def test_invalid_element():
+    """Resolve an invalid or unsupported element
+
+    This method raises a FileNotFoundError
+    """
+    graph = resolver.DependencyGraph(ALL_ELEMENTS)
+
+    with pytest.raises(FileNotFoundError):
+        graph.closure(["invalid_element"])
+
+
+def test_cyclic_dependency():
+    """Resolve elements with cyclic dependencies
+
+    This method raises a CyclicDependencyError reporting the cycle
+    """
+    graph = resolver.DependencyGraph({
+        "ember": {"dep": ["firefly"]},
+        "firefly": {"dep": ["hermes"]},
+        "hermes": {"dep": ["ember"]},
+        "miranda": {"dep": []},
+    })
+
+    with pytest.raises(resolver.CyclicDependencyError) as exc_info:
+        graph.topological_order(graph.closure(["ember", "miranda"]))
+    assert exc_info.value.cycle == ["ember", "firefly", "hermes", "ember"]
+
+
+def test_large_graph():
+    """Resolve a large randomly generated dependency graph
+
+    This method verifies the topological order of thousands of elements.
+    """
+    rand = random.Random(0)
+    all_elements = {
+        f"element{i}": {"dep": [f"element{j}" for j in rand.sample(range(i), min(i, 3))]}
+        for i in range(5000)
+    }
+    graph = resolver.DependencyGraph(all_elements)
+
+    order = graph.topological_order(graph.closure(["element4999"]))
+    position = {element: index for index, element in enumerate(order)}
+    for element in order:
+        for dep in all_elements[element]["dep"]:
+            assert position[dep] < position[element]
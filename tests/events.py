@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import progress
+
+
+def test_parse():
+    """Parse the progress of the commands of phases from their output
+
+    This method verifies that git transfers and Ninja and Makefile builds report their progress,
+    and that other lines do not.
+    """
+    event = progress.parse("hermes", "clone", "Receiving objects:  45% (450/1000), 1.2 MiB")
+    assert event == progress.ProgressEvent("hermes", "clone", 450, 1000, "Receiving objects")
+
+    event = progress.parse("hermes", "clone", "remote: Counting objects: 100% (12/12), done.")
+    assert (event.current, event.total, event.message) == (12, 12, "Counting objects")
+
+    event = progress.parse("hermes", "build", "[12/340] Building CXX object hermes.cc.o")
+    assert (event.current, event.total) == (12, 340)
+    assert event.message == "Building CXX object hermes.cc.o"
+
+    event = progress.parse("hermes", "build", "[  5%] Linking CXX shared library libhermes.so")
+    assert (event.current, event.total) == (5, 100)
+
+    assert progress.parse("hermes", "clone", "Cloning into 'hermes'...") is None
+    assert progress.parse("hermes", "configure", "[12/340] not a build") is None
+    assert progress.parse("hermes", "build", "-- Build files have been written") is None
+
+
+def test_format_eta():
+    """Format the time left in a phase"""
+    assert progress.format_eta(None) == "--:--"
+    assert progress.format_eta(125.7) == "02:05"
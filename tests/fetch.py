@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import installer
+
+fetch = getattr(installer, "__fetch")
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Serve a single resource tagged "v2" and answer 304 to requests revalidating it"""
+
+    requests = []
+
+    def do_GET(self):
+
+        self.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == '"v2"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = b'{"hermes": {}}'
+        self.send_response(200)
+        self.send_header("ETag", '"v2"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+
+        pass
+
+
+@pytest.fixture
+def url():
+
+    Handler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/elements.json"
+    server.shutdown()
+    server.server_close()
+
+
+def write_cache(cache_file, url, etag, fetched):
+
+    cache_file.write_text(json.dumps({
+        "url": url, "etag": etag, "last_modified": None, "fetched": fetched, "body": "cached",
+    }))
+
+
+def test_fresh(tmp_path, url):
+    """Return a cached copy younger than the TTL without a request"""
+    cache_file = tmp_path / "elements.json"
+    write_cache(cache_file, url, '"v1"', time.time())
+
+    assert fetch(url, cache_file) == "cached"
+    assert Handler.requests == []
+
+
+def test_revalidated(tmp_path, url):
+    """Revalidate an expired copy and keep it when the server answers 304
+
+    This method verifies that the ETag of the copy is sent and that the copy is fresh again.
+    """
+    cache_file = tmp_path / "elements.json"
+    write_cache(cache_file, url, '"v2"', time.time() - installer.CACHE_TTL - 1)
+
+    assert fetch(url, cache_file) == "cached"
+    assert [request["If-None-Match"] for request in Handler.requests] == ['"v2"']
+    assert time.time() - json.loads(cache_file.read_text())["fetched"] < installer.CACHE_TTL
+
+    assert fetch(url, cache_file) == "cached"
+    assert len(Handler.requests) == 1
+
+
+def test_corrupt(tmp_path, url):
+    """Download the resource again if the cached copy cannot be parsed"""
+    cache_file = tmp_path / "elements.json"
+    cache_file.write_text('{"url": ')
+
+    assert fetch(url, cache_file) == '{"hermes": {}}'
+    assert "If-None-Match" not in Handler.requests[0]
+    assert json.loads(cache_file.read_text())["etag"] == '"v2"'
+
+
+def test_atomic_write(tmp_path, url, monkeypatch):
+    """Write the cached copy to a temporary file renamed over the previous copy
+
+    This method verifies that readers only ever see a complete copy and no file is left behind.
+    """
+    cache_file = tmp_path / "cache" / "elements.json"
+    renames = []
+
+    def replace(src, dst):
+        # the previous copy is intact until the rename
+        assert not cache_file.exists() or json.loads(cache_file.read_text())["etag"] == '"v1"'
+        assert json.loads(Path(src).read_text())["body"] == '{"hermes": {}}'
+        renames.append((Path(src).parent, Path(dst)))
+        real_replace(src, dst)
+
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", replace)
+
+    assert fetch(url, cache_file) == '{"hermes": {}}'
+    write_cache(cache_file, url, '"v1"', 0)
+    assert fetch(url, cache_file, refresh=True) == '{"hermes": {}}'
+
+    assert renames == [(cache_file.parent, cache_file)] * 2
+    assert [path.name for path in cache_file.parent.iterdir()] == ["elements.json"]
@@ -1,13 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from PyQt5 import QtCore
+from PyQt5 import QtCore, QtGui
 
+import importlib.util
 import os
 import sys
-BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sstelements")
+import threading
+import time
+BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "installer")
 sys.path.append(BASE_DIR)
-import sstelements
+import installer as sstelements
 from gui_test import windows
 
 # suppress all console outputs
@@ -71,3 +74,164 @@ def test_session(qtbot):
     assert sstelements.list_registered_elements() == []
 
     left_click(registered_elements_window.exit_btn)
+
+
+def load_gui():
+
+    # this module shadows the name of the GUI package, which is therefore loaded under another name
+    spec = importlib.util.spec_from_file_location(
+        "elements_gui", os.path.join(BASE_DIR, "gui", "__init__.py"),
+        submodule_search_locations=[os.path.join(BASE_DIR, "gui")]
+    )
+    gui = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = gui
+    spec.loader.exec_module(gui)
+    return (importlib.import_module("elements_gui.templates"),
+            importlib.import_module("elements_gui.windows"))
+
+
+def test_responsiveness(qtbot, monkeypatch):
+
+    delay = 1
+    templates, gui_windows = load_gui()
+
+    def slow(result):
+        def query(*args, **kwargs):
+            time.sleep(delay)
+            return result
+        return query
+
+    # every call of the installer blocks as long as a slow network or subprocess would
+    monkeypatch.setattr(sstelements, "get_version", slow("SST-Core Version (11.0.0)"))
+    monkeypatch.setattr(sstelements, "list_all_elements", slow({"hermes": {}, "zodiac": {}}))
+    monkeypatch.setattr(sstelements, "list_registered_elements", slow(["hermes"]))
+    monkeypatch.setattr(sstelements, "get_info", slow(("hermes README", "hermes URL")))
+    monkeypatch.setattr(templates, "get_default_icon", QtGui.QIcon)
+
+    # the gaps between the ticks of a timer measure how long the event loop is blocked
+    ticks = [time.perf_counter()]
+    timer = QtCore.QTimer()
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start(10)
+
+    window = gui_windows.MainWindow()
+    qtbot.addWidget(window)
+    elements_window = window.elements_window
+    selected_element_window = elements_window.selected_element_window
+
+    qtbot.waitUntil(lambda: "11.0.0" in window.intro.toPlainText(), timeout=10000)
+    qtbot.waitUntil(lambda: elements_window.model.elements == ["hermes", "zodiac"],
+                    timeout=10000)
+    assert elements_window.model.registered == {"hermes"}
+
+    selected_element_window.set_element("hermes")
+    assert selected_element_window.about.toPlainText() == "Loading README..."
+    qtbot.waitUntil(lambda: selected_element_window.about.toPlainText() == "hermes README",
+                    timeout=10000)
+    timer.stop()
+
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < delay / 2
+
+
+def test_elements_model(qtbot, qtmodeltester):
+
+    templates, _ = load_gui()
+    model = templates.ElementsModel(highlight_registered=True)
+    model.set_elements(["hermes", "thornhill", "zodiac"], ["hermes"])
+    qtmodeltester.check(model)
+
+    changes = []
+    model.rowsInserted.connect(lambda parent, first, last: changes.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: changes.append(("remove", first, last)))
+    model.dataChanged.connect(
+        lambda first, last, roles: changes.append(("change", first.row(), last.row()))
+    )
+    model.modelReset.connect(lambda: changes.append(("reset",)))
+
+    # only the rows of the elements added, removed or (un)registered are updated
+    model.set_elements(["ember", "hermes", "zodiac", "miranda"], ["hermes", "zodiac"])
+    assert model.elements == ["ember", "hermes", "zodiac", "miranda"]
+    assert changes == [("remove", 1, 1), ("insert", 0, 0), ("insert", 3, 3), ("change", 2, 2)]
+    assert model.data(model.index(2), QtCore.Qt.BackgroundRole) is not None
+    assert model.data(model.index(3), QtCore.Qt.BackgroundRole) is None
+
+    changes.clear()
+    model.set_elements(["ember", "hermes", "zodiac", "miranda"], ["hermes", "zodiac"])
+    assert changes == []
+
+    model.set_elements(["zodiac", "hermes"], [])
+    assert changes == [("reset",)]
+    qtmodeltester.check(model)
+
+
+def test_cancel(qtbot, monkeypatch):
+
+    templates, _ = load_gui()
+    updates = []
+    messages = []
+
+    class Parent:
+        def update(self, rdata):
+            updates.append(rdata)
+
+    def action(element, force, progress, cancel):
+        progress(sstelements.progress.ProgressEvent(None, "install", 0, 2, "started"))
+        progress(sstelements.progress.ProgressEvent(element, "build", 3, 10, "Building"))
+        # an installation only returns once its commands are killed and rolled back
+        cancel.wait(10)
+        return 2
+
+    monkeypatch.setattr(templates.QtWidgets.QMessageBox, "information",
+                        lambda parent, title, text: messages.append(title))
+
+    splash = templates.SplashScreen(Parent(), "hermes", action, cancel=threading.Event())
+    qtbot.addWidget(splash)
+    splash.show()
+
+    qtbot.waitUntil(lambda: splash.phase_bar.value() == 3, timeout=5000)
+    assert (splash.overall_bar.value(), splash.overall_bar.maximum()) == (0, 2)
+    assert splash.status_label.text().startswith("Build hermes")
+
+    qtbot.mouseClick(splash.cancel_btn, QtCore.Qt.LeftButton)
+    qtbot.waitUntil(lambda: updates == [2], timeout=5000)
+    assert messages == ["Cancelled"]
+    assert not splash.isVisible()
+
+
+def test_stale_readme(qtbot, monkeypatch):
+
+    templates, gui_windows = load_gui()
+    shown = threading.Event()
+
+    def get_info(element):
+        # the README of the element selected first fails once the next one is shown
+        if element == "zodiac":
+            shown.wait(5)
+            raise RuntimeError("zodiac README failed")
+        return (f"{element} README", f"{element} URL")
+
+    monkeypatch.setattr(sstelements, "get_version", lambda: "SST-Core Version (11.0.0)")
+    monkeypatch.setattr(sstelements, "list_all_elements", lambda: {"hermes": {}, "zodiac": {}})
+    monkeypatch.setattr(sstelements, "list_registered_elements", lambda: [])
+    monkeypatch.setattr(sstelements, "get_info", get_info)
+    monkeypatch.setattr(templates, "get_default_icon", QtGui.QIcon)
+    # both queries run at the same time
+    thread_pool = QtCore.QThreadPool.globalInstance()
+    max_threads = thread_pool.maxThreadCount()
+    thread_pool.setMaxThreadCount(max(max_threads, 4))
+
+    window = gui_windows.MainWindow()
+    qtbot.addWidget(window)
+    selected_element_window = window.elements_window.selected_element_window
+
+    try:
+        selected_element_window.set_element("zodiac")
+        selected_element_window.set_element("hermes")
+        qtbot.waitUntil(lambda: selected_element_window.about.toPlainText() == "hermes README",
+                        timeout=5000)
+        shown.set()
+        qtbot.wait(500)
+        assert selected_element_window.about.toPlainText() == "hermes README"
+    finally:
+        shown.set()
+        thread_pool.setMaxThreadCount(max_threads)
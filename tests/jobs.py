@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import fcntl
+import os
+import sys
+import threading
+import time
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import scheduler
+
+GIB = 2 ** 30
+
+
+def fake_cgroups(tmp_path, monkeypatch, cgroups, files):
+
+    proc_cgroup = tmp_path / "cgroup"
+    proc_cgroup.write_text(cgroups)
+    for name, contents in files.items():
+        path = tmp_path / "fs" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+
+    monkeypatch.setattr(scheduler, "PROC_CGROUP", proc_cgroup)
+    monkeypatch.setattr(scheduler, "CGROUP_ROOT", tmp_path / "fs")
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+
+
+def test_cgroup_v2(tmp_path, monkeypatch):
+    """Size jobs from the quotas of a cgroup v2 hierarchy
+
+    This method verifies that the quotas of the ancestors of the cgroup of the process apply.
+    """
+    fake_cgroups(tmp_path, monkeypatch, "0::/slurm/job\n", {
+        "cgroup.controllers": "cpu memory",
+        "cpu.max": "max 100000",
+        "slurm/cpu.max": "250000 100000",
+        "slurm/job/cpu.max": "max 100000",
+        "slurm/memory.max": str(4 * GIB),
+        "slurm/memory.current": str(GIB),
+        "slurm/job/memory.max": "max",
+    })
+
+    assert scheduler.cpu_limit() == 3
+    assert scheduler.available_memory() <= 3 * GIB
+
+    jobs, max_load, limits = scheduler.auto_jobs(GIB, extra=2)
+    assert jobs == min(5, scheduler.available_memory() // GIB)
+    assert max_load == os.cpu_count()
+    assert limits.startswith("3 CPU(s)")
+
+
+def test_cgroup_v1(tmp_path, monkeypatch):
+    """Size jobs from the quotas of cgroup v1 controllers"""
+    fake_cgroups(tmp_path, monkeypatch, "4:memory:/job\n2:cpu,cpuacct:/job\n0::/\n", {
+        "cpu,cpuacct/cpu.cfs_quota_us": "-1",
+        "cpu,cpuacct/cpu.cfs_period_us": "100000",
+        "cpu,cpuacct/job/cpu.cfs_quota_us": "100000",
+        "cpu,cpuacct/job/cpu.cfs_period_us": "100000",
+        "memory/memory.limit_in_bytes": "9223372036854771712",
+        "memory/job/memory.limit_in_bytes": str(GIB),
+        "memory/job/memory.usage_in_bytes": str(GIB // 2),
+    })
+
+    assert scheduler.cpu_limit() == 1
+    assert scheduler.available_memory() <= GIB // 2
+    assert scheduler.auto_jobs(GIB)[0] == 1
+
+
+def test_unlimited(tmp_path, monkeypatch):
+    """Size jobs from the affinity mask of the process outside of cgroups"""
+    fake_cgroups(tmp_path, monkeypatch, "0::/\n", {"cgroup.controllers": ""})
+
+    assert scheduler.cpu_limit() == 8
+
+
+def test_affinity(tmp_path, monkeypatch):
+    """Size jobs from an affinity mask narrower than the CPU quota
+
+    This method verifies that the memory left in the cgroup lowers the number of jobs further.
+    """
+    fake_cgroups(tmp_path, monkeypatch, "0::/job\n", {
+        "cgroup.controllers": "cpu memory",
+        "job/cpu.max": "400000 100000",
+        "job/memory.max": "max",
+    })
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {2, 3}, raising=False)
+
+    assert scheduler.auto_jobs(GIB, extra=2)[0] == min(4, scheduler.available_memory() // GIB)
+    assert scheduler.auto_jobs(GIB)[2].startswith("2 CPU(s)")
+
+    (tmp_path / "fs" / "job" / "memory.max").write_text(str(3 * GIB))
+    (tmp_path / "fs" / "job" / "memory.current").write_text(str(2 * GIB))
+    assert scheduler.auto_jobs(GIB, extra=2)[0] == 1
+
+
+def fake_builds(failing=(), delay=0.05):
+
+    calls = []
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def build(element, jobs, jobserver):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+            calls.append((element, jobs, time.perf_counter()))
+        time.sleep(delay)
+        with lock:
+            running[0] -= 1
+            calls.append((element, None, time.perf_counter()))
+        return element not in failing
+
+    return build, calls, running
+
+
+def test_budget():
+    """Run at most as many builds at a time as the budget of jobs"""
+    build, calls, running = fake_builds()
+    elements = [f"element{index}" for index in range(7)]
+
+    assert scheduler.run_levels([elements], build, 3, {}) == []
+    assert running[1] == 3
+    assert sorted(element for element, jobs, _ in calls if jobs) == elements
+    assert {jobs for _, jobs, _ in calls if jobs} == {1}
+
+
+def test_levels():
+    """Start the builds of a level once every build of the previous level ended
+
+    This method verifies that the dependents of a failed element are skipped without being built.
+    """
+    build, calls, _ = fake_builds(failing=["hermes"])
+    levels = [["hermes", "miranda", "ember"], ["thornhill", "zodiac"], ["vanadis"]]
+    dependencies = {"thornhill": ["miranda"], "zodiac": ["hermes"], "vanadis": ["zodiac"]}
+
+    failed = scheduler.run_levels(levels, build, 4, dependencies)
+    assert sorted(failed) == ["hermes", "vanadis", "zodiac"]
+
+    started = {element: start for element, jobs, start in calls if jobs}
+    ended = {element: end for element, jobs, end in calls if not jobs}
+    assert sorted(started) == ["ember", "hermes", "miranda", "thornhill"]
+    assert started["thornhill"] >= max(ended[element] for element in levels[0])
+    # the jobs of a level are split between its builds
+    assert [jobs for element, jobs, _ in calls if element == "thornhill" and jobs] == [4]
+
+
+def test_jobserver():
+    """Share a budget of jobs between make processes through a jobserver
+
+    Every build runs one job without a token, so the jobserver holds one token less than the budget
+    for each build.
+    """
+    barrier = threading.Barrier(2)
+    tokens = []
+
+    def build(element, jobs, jobserver):
+        # both builds hold the jobserver of the level
+        barrier.wait(5)
+        if element == "hermes":
+            flags = fcntl.fcntl(jobserver.fds[0], fcntl.F_GETFL)
+            fcntl.fcntl(jobserver.fds[0], fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            tokens.append(os.read(jobserver.fds[0], 64))
+            os.write(jobserver.fds[1], tokens[-1])
+            tokens.append(jobserver.env({})["MAKEFLAGS"])
+        barrier.wait(5)
+        return True
+
+    assert scheduler.run_levels([["hermes", "zodiac"]], build, 5, {}, jobserver=True,
+                                max_load=6) == []
+    assert tokens[0] == b"+++"
+    assert tokens[1].startswith("-j --jobserver-auth=") and tokens[1].endswith(" -l 6")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import sys
+import threading
+import time
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import buildlog
+
+
+def test_timeout(tmp_path):
+    """Kill the commands of a phase running past its timeout
+
+    This method verifies that the processes spawned in the background by a command are killed along
+    with it, and that the timeout is reported in the log.
+    """
+    element_log = buildlog.ElementLog("hermes", log_dir=tmp_path, timeouts={"build": 0.5})
+
+    start = time.monotonic()
+    assert element_log.run("build", "echo started; sleep 30 & sleep 30") < 0
+    assert time.monotonic() - start < buildlog.KILL_GRACE
+    assert element_log.get_tail() == ["started", "Build timed out after 0.5 s"]
+
+    # the timeout covers every command of the phase
+    assert element_log.run("build", "echo late") < 0
+    assert element_log.run("configure", "echo configured") == 0
+
+
+def test_cancel(tmp_path):
+    """Kill the running command once the installation is cancelled"""
+    cancel = threading.Event()
+    element_log = buildlog.ElementLog("hermes", log_dir=tmp_path, cancel=cancel)
+
+    threading.Timer(0.5, cancel.set).start()
+    assert element_log.run("clone", "sleep 30") < 0
+    assert element_log.get_tail() == ["Cancelled"]
+    assert element_log.run("configure", "echo configured") < 0
+    assert "Cancelled" in element_log.phase_path("configure").read_text()
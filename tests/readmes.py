@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import functools
+import http.server
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import installer
+
+# seconds the READMEs written are dated ahead, so that every rewrite changes their modification time
+AHEAD = itertools.count(1)
+
+
+class Handler(http.server.SimpleHTTPRequestHandler):
+    """Serve the READMEs of the elements, the preferred one being the slowest"""
+
+    requests = []
+
+    def do_GET(self):
+
+        self.requests.append(self.path)
+        if self.path.endswith("README.md"):
+            time.sleep(0.2)
+        super().do_GET()
+
+    def log_message(self, *args):
+
+        pass
+
+
+@pytest.fixture
+def readmes(environment):
+    """Serve the READMEs under a local directory and point the elements to it"""
+    Handler.requests = []
+    readme_dir = environment / "readmes"
+    readme_dir.mkdir()
+    handler = functools.partial(Handler, directory=str(readme_dir))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    list_file = environment / "elements.json"
+    elements = json.loads(list_file.read_text())
+    for name, info in elements.items():
+        info["url"] = f"http://127.0.0.1:{server.server_port}/{name}"
+    list_file.write_text(json.dumps(elements))
+
+    yield readme_dir
+    server.shutdown()
+    server.server_close()
+
+
+def write_readme(readme_dir, element, file_name, contents):
+
+    path = readme_dir / element / "master" / file_name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contents)
+    # the READMEs are revalidated with the time they were modified at, in seconds
+    mtime = time.time() + next(AHEAD)
+    os.utime(path, (mtime, mtime))
+
+
+def test_preferred(readmes):
+    """Return the preferred README even if a less preferred one is fetched first"""
+    write_readme(readmes, "element0000", "README.md", "markdown")
+    write_readme(readmes, "element0000", "README", "text")
+
+    readme, url = installer.get_info("element0000")
+    assert readme == "markdown"
+    assert url.endswith("/element0000")
+
+
+def test_fallback(readmes):
+    """Fall back on the less preferred README if the preferred one is missing
+
+    This method verifies that an element without README is reported as such.
+    """
+    write_readme(readmes, "element0000", "README", "text")
+
+    assert installer.get_info("element0000")[0] == "text"
+    with pytest.raises(FileNotFoundError):
+        installer.get_info("element0001")
+
+
+def test_memo(readmes, monkeypatch):
+    """Keep READMEs in memory until they expire or the element list is refreshed"""
+    write_readme(readmes, "element0000", "README.md", "first")
+    assert installer.get_info("element0000")[0] == "first"
+    requests = len(Handler.requests)
+
+    write_readme(readmes, "element0000", "README.md", "second")
+    assert installer.get_info("element0000")[0] == "first"
+    assert len(Handler.requests) == requests
+
+    # the memoized README and its cached copy are both revalidated once expired
+    monkeypatch.setattr(installer, "CACHE_TTL", 0)
+    assert installer.get_info("element0000")[0] == "second"
+    assert len(Handler.requests) > requests
+
+    monkeypatch.setattr(installer, "CACHE_TTL", 3600)
+    assert installer.get_info("element0000")[0] == "second"
+    installer.list_all_elements(refresh=True)
+    assert getattr(installer, "__READMES") == {}
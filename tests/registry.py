@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import os
+import sys
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import installer
+
+# prints the elements in the format of `sst-register -l`
+SST_REGISTER = """#!/usr/bin/env python3
+import sys
+
+assert sys.argv[1:] == ["-l"]
+print("1. hermes  VALID")
+print("2. zodiac  VALID")
+"""
+
+
+def generate_config(elements, sources=()):
+
+    config = "# generated\n[SST_CORE]\nlibdir = /sst/lib\n\n"
+    if sources:
+        config += "[SST_ELEMENT_SOURCE]\n" + "".join(f"{name} = /src/{name}\n" for name in sources)
+    for name in elements:
+        config += f"\n[{name}]\n{name}_LIBDIR = /src/{name}/build\n"
+    return config
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+
+    config_file = tmp_path / "sstsimulator.conf"
+    monkeypatch.setattr(installer, "SST_CONFIG_FILE", config_file)
+    monkeypatch.setattr(installer, "__REGISTRY", None)
+    return config_file
+
+
+def test_read_registry(config_file):
+    """Parse the elements registered by source and by library directory
+
+    This method verifies that other sections and elements registered twice are left out.
+    """
+    config_file.write_text(generate_config(["hermes", "zodiac"], sources=["miranda", "hermes"]))
+
+    assert getattr(installer, "__read_registry")() == ["miranda", "hermes", "zodiac"]
+    config_file.write_text("[hermes\n")
+    assert getattr(installer, "__read_registry")() is None
+
+
+def test_snapshot(config_file, monkeypatch):
+    """Read the registry again only once the configuration file changes
+
+    This method verifies that renaming a new file over the configuration file and rewriting it in
+    place, even to the same size, both invalidate the snapshot.
+    """
+    reads = []
+    read_registry = getattr(installer, "__read_registry")
+    monkeypatch.setattr(installer, "__read_registry", lambda: reads.append(1) or read_registry())
+
+    config_file.write_text(generate_config(["hermes"]))
+    assert installer.list_registered_elements() == ["hermes"]
+    assert installer.list_registered_elements() == ["hermes"]
+    assert len(reads) == 1
+
+    # sst-register writes a new file and renames it over the previous one
+    new_file = config_file.with_name("sstsimulator.conf.new")
+    new_file.write_text(generate_config(["hermes", "zodiac"]))
+    os.replace(new_file, config_file)
+    assert installer.list_registered_elements() == ["hermes", "zodiac"]
+    assert len(reads) == 2
+
+    # an edit in place keeps the inode and the size, but not the modification time
+    stat = config_file.stat()
+    config_file.write_text(generate_config(["hermes", "ember_"]))
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert config_file.stat().st_size == stat.st_size
+    assert installer.list_registered_elements() == ["hermes", "ember_"]
+    assert len(reads) == 3
+
+
+def test_fallback(config_file, tmp_path, monkeypatch):
+    """List the elements with `sst-register -l` without a configuration file"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "sst-register").write_text(SST_REGISTER)
+    (bin_dir / "sst-register").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    assert installer.list_registered_elements() == ["hermes", "zodiac"]
+
+    config_file.write_text(generate_config(["miranda"]))
+    assert installer.list_registered_elements() == ["miranda"]
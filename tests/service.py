@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import io
+import json
+import socket
+import sys
+import threading
+
+import pytest
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import daemon
+import installer
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+
+    calls = []
+    started = threading.Event()
+
+    def install(element="", force=False, progress=None, cancel=None, trace=None):
+        calls.append(element)
+        getattr(installer, "__log")("INSTALL", f"Installing {element}...")
+        progress(installer.progress.ProgressEvent(element, "build", 1, 2, ""))
+        started.set()
+        # the installation runs until it is cancelled or every client attached
+        cancel.wait(1)
+        return 2 if cancel.is_set() else 0
+
+    monkeypatch.setattr(installer, "list_all_elements", lambda refresh=False: {"hermes": {}})
+    monkeypatch.setattr(installer, "list_registered_elements", lambda: ["hermes"])
+    monkeypatch.setattr(installer, "update_mirrors", lambda: [])
+    monkeypatch.setattr(installer, "install", install)
+
+    with daemon.Daemon(tmp_path / "installer.sock", refresh_interval=60) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server, calls, started
+        server.shutdown()
+
+
+def test_queries(server, monkeypatch):
+    """Answer queries in the daemon and fall back in process without it
+
+    This method verifies that exceptions raised in the daemon are raised by the client as well.
+    """
+    server, _, _ = server
+    assert daemon.is_running(server.path)
+
+    client = daemon.Client(server.path)
+    assert client.list_all_elements() == {"hermes": {}}
+    assert client.list_registered_elements() == ["hermes"]
+
+    monkeypatch.setattr(installer, "get_dependencies",
+                        lambda element: (_ for _ in ()).throw(FileNotFoundError(element)))
+    with pytest.raises(FileNotFoundError, match="zodiac"):
+        client.get_dependencies("zodiac")
+
+    offline = daemon.Client(server.path.with_name("missing.sock"))
+    assert offline.list_registered_elements() == ["hermes"]
+
+
+def test_jobs(server, capsys):
+    """Share identical installations between clients and stream their logs and progress"""
+    server, calls, started = server
+    events = []
+    results = []
+
+    def request():
+        results.append(daemon.Client(server.path).install("hermes", progress=events.append))
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["hermes"]
+    assert results == [0, 0]
+    assert capsys.readouterr().out.count("[INSTALL] Installing hermes...") == 2
+    assert events[0] == installer.progress.ProgressEvent("hermes", "build", 1, 2, "")
+
+
+def test_cancel(server):
+    """Cancel an installation requested by a single client"""
+    server, calls, started = server
+    cancel = threading.Event()
+    threading.Thread(target=lambda: started.wait(5) and cancel.set()).start()
+
+    assert daemon.Client(server.path).install("hermes", cancel=cancel) == 2
+    assert calls == ["hermes"]
+
+
+@pytest.mark.parametrize("operation, kwargs, error", [
+    ("install", {"element": "hermes", "trace": "/tmp/trace.json"}, "ValueError"),
+    ("install", {"element": "hermes", "n_jobs": "4"}, "ValueError"),
+    ("install", {"element": "hermes", "toolchain": {"CC": "/tmp/cc"}}, "ValueError"),
+    ("uninstall", {"elements": ["../hermes"]}, "FileNotFoundError"),
+])
+def test_untrusted_requests(server, operation, kwargs, error):
+    """Refuse requests with arguments the daemon does not accept
+
+    This method verifies that requests for paths, elements off the official list and toolchains
+    other than the toolchain of the daemon are refused before any job runs.
+    """
+    server, calls, _ = server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(server.path))
+        connection.sendall(json.dumps({"operation": operation, "kwargs": kwargs}).encode("utf-8")
+                           + b"\n")
+        assert json.loads(connection.makefile().readline())["error"] == error
+    assert calls == []
+
+    # the toolchain of a client sharing the environment of the daemon is accepted
+    assert daemon.check_request("install", {"toolchain": daemon.toolchain()}) == {}
+
+
+def test_thread_context(tmp_path, capsys):
+    """Keep the log and the tracer of an operation to the threads it runs on
+
+    This method verifies that a query run while a job runs on another thread neither logs to the
+    job nor joins its tracer, while the threads started by the job do.
+    """
+    log = getattr(installer, "__log")
+    span = getattr(installer, "__span")
+    traced = getattr(installer, "__traced")
+    stream = io.StringIO()
+    started = threading.Event()
+    proceed = threading.Event()
+
+    @traced()
+    def job():
+        started.set()
+        proceed.wait(5)
+        log("INSTALL", "job")
+        thread = threading.Thread(target=getattr(installer, "__in_context")(
+            lambda: log("INSTALL", "build")))
+        thread.start()
+        thread.join()
+
+    @traced()
+    def query():
+        log("REQUEST", "query")
+        with span("query", "hermes"):
+            pass
+
+    def run_job():
+        with installer.redirect_log(stream):
+            job()
+
+    thread = threading.Thread(target=run_job)
+    thread.start()
+    started.wait(5)
+    query(trace=str(tmp_path / "query.json"))
+    proceed.set()
+    thread.join()
+
+    assert stream.getvalue() == "[INSTALL] job\n[INSTALL] build\n"
+    assert capsys.readouterr().out == "[REQUEST] query\n"
+    events = json.loads((tmp_path / "query.json").read_text())["traceEvents"]
+    assert [event["name"] for event in events if event.get("ph") == "X"] == ["query hermes"]
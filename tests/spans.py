@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import json
+import sys
+import threading
+import time
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import timing
+
+
+def test_chrome_trace(tmp_path):
+    """Export nested and concurrent spans as Chrome trace events
+
+    This method verifies that nested spans lie within their parent on the same track, spans of
+    other threads get a track of their own, and the CPU time of child processes is added.
+    """
+    tracer = timing.Tracer()
+    with tracer.span("build", "hermes"):
+        with tracer.span("configure", "hermes") as record:
+            record["child_cpu"] += 1.5
+            time.sleep(0.01)
+
+    def clone():
+        with tracer.span("clone", "zodiac"):
+            pass
+
+    thread = threading.Thread(target=clone, name="clone_0")
+    thread.start()
+    thread.join()
+
+    tracer.write(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    tracks = {event["args"]["name"]: event["tid"] for event in events if event["ph"] == "M"}
+
+    build, configure = spans["build hermes"], spans["configure hermes"]
+    clone = spans["clone zodiac"]
+    assert build["ts"] <= configure["ts"]
+    assert configure["ts"] + configure["dur"] <= build["ts"] + build["dur"]
+    assert configure["dur"] >= 0.01 * 1e6
+    assert configure["cat"] == "configure" and configure["args"]["element"] == "hermes"
+    assert configure["args"]["cpu_ms"] >= 1500
+    assert build["tid"] == configure["tid"] == tracks[threading.current_thread().name]
+    assert clone["tid"] == tracks["clone_0"] != build["tid"]
+
+
+def test_summary():
+    """Sum the wall and CPU times of the phases of every element"""
+    tracer = timing.Tracer()
+    for phase, element, seconds, cpu in (("clone", "hermes", 1, 0.5), ("build", "hermes", 2, 4),
+                                         ("build", "hermes", 0.5, 1), ("clone", "zodiac", 3, 1)):
+        tracer.events.append({
+            "name": f"{phase} {element}", "cat": phase, "ph": "X", "ts": 0, "dur": seconds * 1e6,
+            "args": {"element": element, "cpu_ms": cpu * 1e3},
+        })
+
+    header, _, hermes, zodiac, elapsed = tracer.summary().splitlines()
+    assert header.split() == ["element", "clone", "build", "total", "cpu"]
+    assert hermes.split() == ["hermes", "1.00", "2.50", "3.50", "5.50"]
+    assert zodiac.split() == ["zodiac", "3.00", "0.00", "3.00", "1.00"]
+    assert elapsed.endswith("for 6.50s of phases")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).absolute().parent.parent / "installer"
+sys.path.append(str(BASE_DIR))
+import installer
+
+CONFIG = """# registered by hand
+[SST_ELEMENT_SOURCE]
+hermes = /src/hermes
+miranda = /src/miranda
+
+[hermes]
+hermes_LIBDIR = /src/hermes/build
+hermes_TESTS =
+    /src/hermes/tests
+
+[zodiac]
+zodiac_LIBDIR = /src/zodiac/build
+
+[miranda]
+miranda_LIBDIR = /src/miranda/build
+"""
+
+
+def test_batch_uninstall(tmp_path, monkeypatch):
+    """Uninstall elements together and delete their directories in the background
+
+    This method verifies that the entries of the other elements and the comments of the SST
+    configuration file are kept, and that nothing is removed if an element is missing.
+    """
+    config_file = tmp_path / "sstsimulator.conf"
+    config_file.write_text(CONFIG)
+    for element in ("hermes", "zodiac", "miranda"):
+        (tmp_path / element / "build").mkdir(parents=True)
+        (tmp_path / element / "build" / f"lib{element}.so").write_bytes(b"\0" * 1024)
+
+    monkeypatch.setattr(installer, "ELEMENT_LIST_URL", "file:///elements.json")
+    monkeypatch.setattr(installer, "ELEMENT_SRC_DIR", str(tmp_path))
+    monkeypatch.setattr(installer, "SST_CONFIG_FILE", config_file)
+    monkeypatch.setattr(installer, "__CONFIGURED", False)
+    monkeypatch.chdir(tmp_path)
+
+    assert installer.uninstall("hermes", elements=["missing"]) == 2
+    assert (tmp_path / "hermes").is_dir()
+    assert config_file.read_text() == CONFIG
+
+    assert installer.uninstall("hermes", elements=["zodiac"]) == 1
+    assert not (tmp_path / "hermes").exists() and not (tmp_path / "zodiac").exists()
+    assert installer.list_registered_elements() == ["miranda"]
+    assert config_file.read_text() == (
+        "# registered by hand\n[SST_ELEMENT_SOURCE]\nmiranda = /src/miranda\n\n"
+        "[miranda]\nmiranda_LIBDIR = /src/miranda/build\n"
+    )
+
+    deadline = time.monotonic() + 5
+    while any((tmp_path / installer.TRASH_DIR).iterdir()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not any((tmp_path / installer.TRASH_DIR).iterdir())
+    assert (tmp_path / "miranda" / "build" / "libmiranda.so").is_file()